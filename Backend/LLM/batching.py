@@ -0,0 +1,114 @@
+import re
+import json
+import logging
+import statistics
+from .config import GEMINI_MAX_OUTPUT_TOKENS
+from .rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# A batched TTS response restates every post and comment it was given, so it is about as long as
+# its input. The input limit of the model (a million tokens) is never the constraint; its response
+# cap is, so a batch's input gets three quarters of that cap and the rest is left for labels and
+# JSON escaping. Set GEMINI_MAX_OUTPUT_TOKENS for models with a larger response cap.
+DEFAULT_BATCH_TOKEN_BUDGET = GEMINI_MAX_OUTPUT_TOKENS * 3 // 4
+
+
+def pack_batches(items, token_budget=DEFAULT_BATCH_TOKEN_BUDGET):
+    """
+    Pack items into batches whose estimated size stays within a token budget.
+
+    Items are placed largest first into the first batch with room for them (first-fit
+    decreasing), so small items fill the gaps next to large ones instead of starting new batches.
+
+    :param items: Dictionary mapping item id to a JSON-serializable payload
+    :param token_budget: Maximum estimated tokens of the payloads in one batch
+    :return: List of batches, each a dictionary of item id to payload; an item larger than
+             the budget gets a batch of its own
+    """
+    sizes = {item_id: estimate_tokens(json.dumps(payload)) for item_id, payload in items.items()}
+    batches, batch_tokens = [], []
+    for item_id in sorted(items, key=sizes.get, reverse=True):
+        for index, tokens in enumerate(batch_tokens):
+            if tokens + sizes[item_id] <= token_budget:
+                batches[index][item_id] = items[item_id]
+                batch_tokens[index] += sizes[item_id]
+                break
+        else:
+            batches.append({item_id: items[item_id]})
+            batch_tokens.append(sizes[item_id])
+    return batches
+
+
+def parse_batch_response(response, expected_ids):
+    """
+    Parse a batched response into a dictionary of item id to text.
+
+    Markdown code fences around the JSON are tolerated. Ids that are missing, not strings or
+    empty are left out, so the caller can fall back to single requests for them.
+
+    :return: Dictionary of the ids that were answered, or an empty dictionary if the response is not valid JSON
+    """
+    if not response:
+        return {}
+
+    text = re.sub(r'^\s*```(?:json)?\s*|\s*```\s*$', '', response)
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Could not parse batched response as JSON: {e}")
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    return {
+        item_id: parsed[item_id].strip()
+        for item_id in expected_ids
+        if isinstance(parsed.get(item_id), str) and parsed[item_id].strip()
+    }
+
+
+async def generate_batched(gemini_client, items, batch_template, single_prompt, token_budget=DEFAULT_BATCH_TOKEN_BUDGET):
+    """
+    Answer many items with as few requests as possible, packing several into each prompt.
+
+    Each batch prompt is ``batch_template`` with ``[INPUT_JSON]`` replaced by a JSON object of
+    item id to payload, and asks for a JSON object of item id to text in return. Items that end
+    up alone in a batch, and items a batch response failed to answer, are sent one by one with
+    ``single_prompt``.
+
+    :param gemini_client: GeminiClient used for the requests
+    :param items: Dictionary mapping item id to a JSON-serializable payload
+    :param batch_template: Prompt template of a batch, containing ``[INPUT_JSON]``
+    :param single_prompt: Callable building the single-item prompt from an item id
+    :param token_budget: Maximum estimated payload tokens per batch
+    :return: Dictionary mapping every item id to its text (None if it failed)
+    """
+    batches = pack_batches(items, token_budget)
+    multi_batches = [batch for batch in batches if len(batch) > 1]
+    results = {}
+    if items:
+        median_tokens = statistics.median(estimate_tokens(json.dumps(payload)) for payload in items.values())
+        logger.info(
+            f"Packed {len(items)} items into {len(batches)} batches ({len(multi_batches)} with several items); "
+            f"the median item is {median_tokens:.0f} tokens of a {token_budget}-token budget"
+        )
+
+    if multi_batches:
+        responses = await gemini_client.generate_many_async(
+            [batch_template.replace("[INPUT_JSON]", json.dumps(batch, indent=1)) for batch in multi_batches],
+            response_mime_type="application/json"
+        )
+        for batch, response in zip(multi_batches, responses):
+            results.update(parse_batch_response(response, batch))
+
+    fallback_ids = [item_id for item_id in items if item_id not in results]
+    logger.info(
+        f"Answered {len(results)} of {len(items)} items with {len(multi_batches)} batched requests, "
+        f"sending {len(fallback_ids)} one by one"
+    )
+    if fallback_ids:
+        responses = await gemini_client.generate_many_async([single_prompt(item_id) for item_id in fallback_ids])
+        results.update(zip(fallback_ids, responses))
+
+    return {item_id: results.get(item_id) for item_id in items}
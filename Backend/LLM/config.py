@@ -17,4 +17,11 @@ logging.basicConfig(
     handlers=[
         logging.StreamHandler()
     ]
-)
\ No newline at end of file
+)
+
+# Gemini quota, used to rate-limit concurrent requests (defaults match the free tier of gemini-1.5-flash)
+
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '15'))
+GEMINI_TOKENS_PER_MINUTE = int(os.getenv('GEMINI_TOKENS_PER_MINUTE', '1000000'))
+# Largest response the model can write (8192 for gemini-1.5-flash); batched TTS preparation is sized from it
+GEMINI_MAX_OUTPUT_TOKENS = int(os.getenv('GEMINI_MAX_OUTPUT_TOKENS', '8192'))
@@ -1,7 +1,12 @@
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 import os
+import random
+import asyncio
 import logging
-from .config import GEMINI_API_KEY
+from .config import GEMINI_API_KEY, GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE
+from .rate_limiter import RateLimiter, estimate_tokens
+from .prompt_registry import PromptRegistry
 
 # Load the API Key from environment variables
 api_key = GEMINI_API_KEY
@@ -19,37 +24,178 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prompt templates shared by all clients, loaded once and reloaded when their file changes
+prompt_registry = PromptRegistry()
+
+# Errors worth retrying: quota exhaustion and temporary server-side failures
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
+
 class GeminiClient:
-    def __init__(self, model_name="gemini-1.5-flash"):
+    def __init__(self, model_name="gemini-1.5-flash", cache=None, max_concurrency=4, rate_limiter=None, max_retries=3, backoff_base=2.0):
+        """
+        :param model_name: Name of the Gemini model to use.
+        :param cache: Optional ResponseCache; identical prompts are then answered from disk.
+        :param max_concurrency: Maximum number of requests in flight at once for the async API.
+        :param rate_limiter: RateLimiter shared by the async API (defaults to the configured Gemini quota).
+        :param max_retries: Number of retries of a request that failed with a transient error.
+        :param backoff_base: Base delay in seconds of the exponential backoff between retries.
+        """
+        self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._semaphore = None
+        self._semaphore_loop = None
 
-    def generate_content(self, prompt):
+    def generate_content(self, prompt, use_cache=True):
         """
         Generate content based on the provided prompt.
 
         :param prompt: The text prompt to send to the model.
+        :param use_cache: Set to False to bypass the response cache and always call the API.
         :return: The generated content.
         """
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                logger.info("Content served from response cache.")
+                return cached
+
         try:
             response = self.model.generate_content(prompt)
+            # Reading the text raises for blocked or empty responses
+            text = response.text
             logger.info("Content generated successfully.")
-            return response.text
         except Exception as e:
             logger.error(f"Error generating content: {e}")
             return None
 
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, text)
+        return text
+
+    async def generate_content_async(self, prompt, use_cache=True, response_mime_type=None):
+        """
+        Generate content asynchronously, within the concurrency limit and the rate limit.
+
+        Transient errors (quota exhaustion, unavailable or overloaded service, timeouts) are
+        retried with exponential backoff and full jitter.
+
+        :param prompt: The text prompt to send to the model.
+        :param use_cache: Set to False to bypass the response cache and always call the API.
+        :param response_mime_type: Optional output format to request, e.g. "application/json".
+        :return: The generated content, or None if every attempt failed.
+        """
+        cache_model_key = f"{self.model_name}:{response_mime_type}" if response_mime_type else self.model_name
+        generation_config = {"response_mime_type": response_mime_type} if response_mime_type else None
+
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(cache_model_key, prompt)
+            if cached is not None:
+                logger.info("Content served from response cache.")
+                return cached
+
+        # asyncio primitives belong to one event loop; workflows may call asyncio.run more than once
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.rate_limiter.acquire(estimate_tokens(prompt))
+                async with self._semaphore:
+                    response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+                text = response.text
+                break
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Error generating content after {attempt + 1} attempts: {e}")
+                    return None
+                delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+                logger.warning(f"Transient error generating content ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Error generating content: {e}")
+                return None
+
+        logger.info("Content generated successfully.")
+        if self.cache is not None:
+            self.cache.put(cache_model_key, prompt, text)
+        return text
+
+    async def generate_content_stream_async(self, prompt, use_cache=True):
+        """
+        Stream generated content as it is produced.
+
+        The request waits for the rate limit and the concurrency limit like
+        ``generate_content_async``. It is not retried, since part of the response may already
+        have been consumed; errors are raised to the consumer. A cached response is yielded as a
+        single chunk, and a completed stream is written to the cache.
+
+        :param prompt: The text prompt to send to the model.
+        :param use_cache: Set to False to bypass the response cache and always call the API.
+        :return: Async generator of text chunks.
+        """
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                logger.info("Content served from response cache.")
+                yield cached
+                return
+
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        parts = []
+        await self.rate_limiter.acquire(estimate_tokens(prompt))
+        async with self._semaphore:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+
+        logger.info("Content streamed successfully.")
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, "".join(parts))
+
+    async def generate_many_async(self, prompts, use_cache=True, response_mime_type=None):
+        """
+        Generate content for many prompts concurrently.
+
+        :param prompts: Iterable of text prompts.
+        :param use_cache: Set to False to bypass the response cache.
+        :param response_mime_type: Optional output format to request for every prompt.
+        :return: List of generated contents in prompt order (None for prompts that failed).
+        """
+        return await asyncio.gather(
+            *(self.generate_content_async(prompt, use_cache, response_mime_type) for prompt in prompts)
+        )
+
     def load_prompt(self, prompt_file):
         """
         Load a prompt from a text file.
 
+        The file is read once and served from the prompt registry until it changes on disk.
+
         :param prompt_file: The path to the prompt file.
         :return: The prompt text.
         """
         try:
-            with open(prompt_file, 'r') as file:
-                prompt = file.read().strip()  # Read and strip any extra whitespace
-            logger.info(f"Loaded prompt from {prompt_file}")
-            return prompt
+            return prompt_registry.get(prompt_file).text
         except Exception as e:
             logger.error(f"Failed to load prompt from {prompt_file}: {e}")
             return None
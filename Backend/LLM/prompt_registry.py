@@ -0,0 +1,78 @@
+import os
+import re
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = os.path.join('Backend', 'LLM', 'prompts')
+
+# Placeholders are upper-case names in square brackets, e.g. [INPUT_JSON]
+PLACEHOLDER_PATTERN = re.compile(r'\[([A-Z][A-Z0-9_]*)\]')
+
+
+class PromptTemplate:
+    """A prompt file compiled once into literal parts and placeholders."""
+
+    def __init__(self, path, text, mtime):
+        self.path = path
+        self.text = text
+        self.mtime = mtime
+        self._parts = PLACEHOLDER_PATTERN.split(text)  # Literal, name, literal, name, ..., literal
+        self.variables = list(dict.fromkeys(self._parts[1::2]))
+
+    def render(self, **values):
+        """
+        Fill in the placeholders.
+
+        :param values: Placeholder values by name (``input_json=...`` fills ``[INPUT_JSON]``)
+        :return: The full prompt
+        """
+        values = {name.upper(): value for name, value in values.items()}
+        missing = [name for name in self.variables if name not in values]
+        if missing:
+            raise KeyError(f"Missing values for prompt placeholders {missing} in {self.path}")
+
+        return ''.join(
+            str(values[part]) if index % 2 else part
+            for index, part in enumerate(self._parts)
+        )
+
+
+class PromptRegistry:
+    """Loads prompt templates once and serves them from memory until their file changes."""
+
+    def __init__(self, prompts_dir=PROMPTS_DIR):
+        """
+        :param prompts_dir: Directory that relative template names are resolved against
+        """
+        self.prompts_dir = prompts_dir
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name):
+        if os.path.exists(name):
+            return name
+        path = os.path.join(self.prompts_dir, name)
+        return path if os.path.splitext(path)[1] else f"{path}.txt"
+
+    def get(self, name):
+        """
+        Return the compiled template for a prompt name or path, reloading it if the file changed.
+
+        :param name: Path of the prompt file, or its name relative to ``prompts_dir`` (``.txt`` optional)
+        """
+        path = self._resolve(name)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            template = self._templates.get(path)
+            if template is None or template.mtime != mtime:
+                with open(path, 'r', encoding='utf-8') as file:
+                    template = PromptTemplate(path, file.read().strip(), mtime)
+                self._templates[path] = template
+                logger.info(f"Loaded prompt template from {path}")
+            return template
+
+    def render(self, name, **values):
+        """Render a template to a full prompt."""
+        return self.get(name).render(**values)
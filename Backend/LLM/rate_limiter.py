@@ -0,0 +1,74 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text):
+    """Rough token count of a text (about four characters per token for English)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """A token bucket that refills continuously up to ``capacity`` at ``capacity`` tokens per minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` tokens are available (0 if they are available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)  # A request larger than the bucket only waits for a full bucket
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Async rate limiter matching an API quota of requests per minute and tokens per minute.
+
+    ``acquire`` waits until both buckets have room for one more request of the given size.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        """
+        :param requests_per_minute: Maximum number of requests per minute
+        :param tokens_per_minute: Maximum number of tokens per minute (None for no token limit)
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = None
+        self._lock_loop = None
+
+    async def acquire(self, tokens=0):
+        """Wait until a request using ``tokens`` tokens fits in the quota, then reserve it."""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:  # asyncio locks belong to one event loop
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+
+        async with self._lock:  # Serve waiters in order so large requests aren't starved
+            while True:
+                wait = self.requests.wait_time(1)
+                if self.tokens is not None:
+                    wait = max(wait, self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+            self.requests.consume(1)
+            if self.tokens is not None:
+                self.tokens.consume(tokens)
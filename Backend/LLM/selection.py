@@ -0,0 +1,144 @@
+import re
+import asyncio
+import logging
+from .rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Estimated prompt tokens of candidate posts per selection request
+DEFAULT_SHARD_TOKEN_BUDGET = 30000
+
+# Characters of a post body shown to the model (None shows the full body)
+DEFAULT_BODY_CHARS = 2000
+
+
+def format_post_for_selection(post, body_chars=DEFAULT_BODY_CHARS):
+    """Describe a candidate post for the selection prompt, truncating long bodies."""
+    body = post['body']
+    if body_chars is not None and len(body) > body_chars:
+        body = body[:body_chars].rstrip() + '...'
+    return (
+        f"Post id: {post['id']}\n"
+        f"Title: {post['title']}\n"
+        f"Body: {body}\n"
+        f"Score: {post['score']}\n"
+        f"Number of Comments: {post['num_comments']}\n"
+        f"Over 18: {post['over_18']}\n"
+        f"Upvote Ratio: {post['upvote_ratio']}\n"
+        f"Stickied: {post['is_stickied']}\n"
+        f"Media: {'None' if not post['media'] else 'Media present'}"
+    )
+
+
+def parse_selected_ids(response, candidate_ids):
+    """
+    Extract the selected post ids from a selection response, in the order they appear.
+
+    Only ids of the candidates that were sent are accepted, so stray words or hallucinated ids
+    in the response are ignored.
+    """
+    if not response:
+        return []
+    candidate_ids = set(candidate_ids)
+    selected = []
+    for token in re.findall(r'[A-Za-z0-9_]+', response):
+        if token in candidate_ids and token not in selected:
+            selected.append(token)
+    return selected
+
+
+def shard_posts(posts, token_budget=DEFAULT_SHARD_TOKEN_BUDGET, body_chars=DEFAULT_BODY_CHARS):
+    """
+    Split candidate posts into shards whose descriptions fit in the token budget.
+
+    :return: List of shards, each a list of ``(post, description)`` pairs
+    """
+    shards, shard, shard_tokens = [], [], 0
+    for post in posts:
+        description = format_post_for_selection(post, body_chars)
+        tokens = estimate_tokens(description)
+        if shard and shard_tokens + tokens > token_budget:
+            shards.append(shard)
+            shard, shard_tokens = [], 0
+        shard.append((post, description))
+        shard_tokens += tokens
+    if shard:
+        shards.append(shard)
+    return shards
+
+
+async def _select_from_shard(gemini_client, shard, prompt_template, limit):
+    posts_info = "\n\n".join(description for _, description in shard)
+    prompt = prompt_template.render(limit=limit, reddit_posts=posts_info)
+    response = await gemini_client.generate_content_async(prompt)
+    if response is None:
+        logger.error(f"Selection failed for a shard of {len(shard)} posts")
+    selected_ids = parse_selected_ids(response, [post['id'] for post, _ in shard])
+    by_id = {post['id']: post for post, _ in shard}
+    return [by_id[post_id] for post_id in selected_ids[:limit]]
+
+
+def shard_quotas(shard_sizes, limit):
+    """
+    Number of posts each shard keeps in a selection round.
+
+    A round keeps about half of the pool, but never fewer than ``limit`` posts, so later rounds
+    can still select ``limit`` posts. The posts kept are shared out between the shards in
+    proportion to their size (largest remainder first).
+    """
+    pool_size = sum(shard_sizes)
+    target = min(pool_size, max(limit, pool_size // 2))
+    shares = [target * size / pool_size for size in shard_sizes]
+    quotas = [int(share) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda index: shares[index] - quotas[index], reverse=True)
+    for index in by_remainder[:target - sum(quotas)]:
+        quotas[index] += 1
+    return quotas
+
+
+async def select_posts(gemini_client, posts, prompt_template, limit=24, token_budget=DEFAULT_SHARD_TOKEN_BUDGET, body_chars=DEFAULT_BODY_CHARS):
+    """
+    Select the most promising posts with a token-budgeted map-reduce over the candidates.
+
+    Candidates that fit in one request are selected directly. Larger pools are split into
+    shards that fit the budget and every shard picks its best posts concurrently. Each round
+    keeps about half of the pool but never fewer than ``limit`` posts (see ``shard_quotas``), and
+    rounds repeat until the winners fit in one request or are no more than ``limit`` posts.
+
+    :param gemini_client: GeminiClient used for the selection requests
+    :param posts: Candidate post dictionaries (or PostRecords)
+    :param prompt_template: PromptTemplate of the selection instructions (reddit_post_selection_for_tiktok.txt),
+                            with [LIMIT] and [REDDIT_POSTS] placeholders
+    :param limit: Maximum number of posts to select
+    :param token_budget: Estimated prompt tokens of candidate descriptions per request
+    :param body_chars: Characters of each post body shown to the model (None for the full body)
+    :return: List of selected posts
+    """
+    candidates = list(posts)
+    round_number = 1
+    while candidates:
+        shards = shard_posts(candidates, token_budget, body_chars)
+        if len(shards) == 1:
+            logger.info(f"Final selection round over {len(candidates)} posts")
+            return await _select_from_shard(gemini_client, shards[0], prompt_template, limit)
+
+        logger.info(f"Selection round {round_number}: {len(candidates)} posts in {len(shards)} shards")
+        quotas = shard_quotas([len(shard) for shard in shards], limit)
+        winners = await asyncio.gather(
+            *(
+                _select_from_shard(gemini_client, shard, prompt_template, quota)
+                for shard, quota in zip(shards, quotas)
+                if quota
+            )
+        )
+        next_candidates = [post for shard_winners in winners for post in shard_winners]
+        if len(next_candidates) <= limit:
+            return next_candidates
+        if len(next_candidates) >= len(candidates):
+            logger.warning("Token budget is smaller than a single post; returning the shard winners as they are")
+            return next_candidates[:limit]
+        candidates = next_candidates
+        round_number += 1
+
+    return []
+
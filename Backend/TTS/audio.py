@@ -0,0 +1,69 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Edge TTS reports word offsets and durations in ticks of 100 nanoseconds
+TICKS_PER_SECOND = 10_000_000
+
+# MPEG audio Layer III tables, indexed by the version bits of the frame header
+_BITRATES_KBPS = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG-1
+    0b10: [22050, 24000, 16000],  # MPEG-2
+    0b00: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def _skip_id3(data):
+    """Offset of the first byte after an ID3v2 tag (0 if there is none)."""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]  # Syncsafe integer
+        return 10 + size
+    return 0
+
+
+def mp3_info(data):
+    """
+    Measure MP3 audio by walking its frame headers, without decoding it.
+
+    :param data: Bytes of an MP3 stream (Layer III, optionally starting with an ID3v2 tag)
+    :return: Tuple of (duration in seconds, sample rate in Hz, number of frames)
+    """
+    position = _skip_id3(data)
+    samples = 0
+    frames = 0
+    sample_rate = 0
+    length = len(data)
+
+    while position + 4 <= length:
+        header = int.from_bytes(data[position:position + 4], 'big')
+        version = (header >> 19) & 0b11
+        layer = (header >> 17) & 0b11
+        bitrate_index = (header >> 12) & 0b1111
+        sample_rate_index = (header >> 10) & 0b11
+
+        if (header >> 21) != 0x7FF or version == 0b01 or layer != 0b01 \
+                or bitrate_index in (0, 15) or sample_rate_index == 3:
+            position += 1  # Not a Layer III frame header; resynchronize on the next byte
+            continue
+
+        is_mpeg1 = version == 0b11
+        bitrate = _BITRATES_KBPS['mpeg1' if is_mpeg1 else 'mpeg2'][bitrate_index] * 1000
+        sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+        padding = (header >> 9) & 1
+        frame_length = (144 if is_mpeg1 else 72) * bitrate // sample_rate + padding
+
+        samples += 1152 if is_mpeg1 else 576
+        frames += 1
+        position += frame_length
+
+    duration = samples / sample_rate if sample_rate else 0.0
+    return duration, sample_rate, frames
+
+
+def mp3_duration_ticks(data):
+    """Duration of MP3 audio in Edge TTS ticks (100 ns)."""
+    return round(mp3_info(data)[0] * TICKS_PER_SECOND)
@@ -0,0 +1,22 @@
+from .edge_tts import EdgeTTSClient
+from .local_tts import LocalTTSClient
+
+# TTS backends by name; every backend writes the same narration.mp3/narration.vtt/narration.json files
+TTS_BACKENDS = {
+    EdgeTTSClient.name: EdgeTTSClient,
+    LocalTTSClient.name: LocalTTSClient,
+}
+
+
+def create_tts_client(backend="edge", **options):
+    """
+    Create the TTS client of a backend.
+
+    :param backend: Backend name ("edge" for the online Edge service, "local" for espeak-ng)
+    :param options: Options of the client (voice, cache, request_timeout, max_retries, ...)
+    """
+    try:
+        client_class = TTS_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{backend}'. Choose from {sorted(TTS_BACKENDS)}.") from None
+    return client_class(**options)
@@ -0,0 +1,282 @@
+import os
+import re
+import random
+import asyncio
+import contextlib
+import logging
+from .segments import DEFAULT_CHUNK_CHARS, iter_sentences, split_chunks, write_segments
+
+logger = logging.getLogger(__name__)
+
+
+class TTSClient:
+    """
+    Narration pipeline shared by all TTS backends.
+
+    A backend only has to synthesize one piece of text into a ``Segment`` (MP3 audio plus word
+    boundaries) in ``_synthesize_segment``. Chunking, parallelism, caching, retries, stitching and
+    the narration.mp3/narration.vtt/narration.json files are handled here, so every backend
+    produces the same output.
+    """
+
+    # Short backend name, used in cache keys so backends never share cached audio
+    name = None
+    default_voice = None
+    # Default number of TTS requests in flight for a batch
+    default_concurrency = 4
+    # Errors worth retrying
+    transient_errors = (asyncio.TimeoutError,)
+
+    def __init__(
+        self,
+        voice=None,
+        cache=None,
+        request_timeout=None,
+        max_retries=0,
+        backoff_base=2.0,
+        request_semaphore=None
+    ):
+        """
+        :param voice: Voice name of the backend (default: the backend's ``default_voice``).
+        :param cache: Optional TTSCache; every chunk of a narration is looked up before it is
+                      synthesized, and chunks synthesized before are reused.
+        :param request_timeout: Seconds one TTS request may take before it is abandoned (None for no limit).
+        :param max_retries: Number of times a failed TTS request is retried, with exponential backoff.
+        :param backoff_base: Upper bound in seconds of the first retry delay; it doubles on every retry.
+        :param request_semaphore: Optional asyncio.Semaphore shared by clients to cap the number of
+                                  TTS requests in flight.
+        """
+        self.voice = voice or self.default_voice
+        self.cache = cache
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.request_semaphore = request_semaphore
+
+    @property
+    def cache_voice(self):
+        """Voice name as stored in the TTS cache."""
+        return f"{self.name}/{self.voice}"
+
+    async def synthesize_post(self, text, folder_path, rate="100%", pitch="+0Hz", chunk_chars=DEFAULT_CHUNK_CHARS, max_concurrency=4):
+        """
+        Synthesizes speech from the provided text and saves it as an audio file.
+
+        Audio and subtitles come from a single synthesis pass per request. Text longer than
+        ``chunk_chars`` is split at sentence boundaries and the chunks are synthesized
+        concurrently, then stitched back together (see ``synthesize_chunks``). With a cache,
+        chunks whose text was synthesized before are served from it instead. A narration.json
+        manifest with the duration and word timings is written next to the audio.
+
+        :param text: The text to synthesize.
+        :param folder_path: The path where the audio file will be saved.
+        :param rate: The speech rate for synthesis (default is "100%").
+        :param pitch: The pitch adjustment for synthesis, e.g. "+0Hz" or "-5Hz".
+        :param chunk_chars: Maximum characters per TTS request (None synthesizes the text in one request).
+        :param max_concurrency: Maximum number of chunks synthesized at the same time.
+        :return: Paths to the saved audio and VTT files.
+        """
+        try:
+            return await self.synthesize_to_files(text, folder_path, rate, pitch, chunk_chars, max_concurrency)
+        except Exception as e:
+            logger.error(f"Error in synthesizing speech: {e}")
+            return None, None
+
+    async def synthesize_to_files(self, text, folder_path, rate="100%", pitch="+0Hz", chunk_chars=DEFAULT_CHUNK_CHARS, max_concurrency=4):
+        """
+        Same as ``synthesize_post``, but raises the error of a failed synthesis instead of returning None.
+        """
+        # Validate the rate and pitch
+        rate = self.validate_rate(rate)
+        pitch = self.validate_pitch(pitch)
+
+        # Create output file paths
+        audio_path = os.path.join(folder_path, 'narration.mp3')
+        vtt_path = os.path.join(folder_path, 'narration.vtt')
+
+        # The cache is keyed by chunk, so a cold cache costs as many requests as no cache at all
+        if chunk_chars is not None and len(text) > chunk_chars:
+            chunks = split_chunks(text, chunk_chars)
+        else:
+            chunks = [text]
+
+        if len(chunks) > 1 or self.cache is not None:
+            await self._write_chunks(chunks, audio_path, vtt_path, max_concurrency, rate, pitch)
+            logger.info(f"Synthesized audio saved at: {audio_path} ({len(chunks)} chunks)")
+            return audio_path, vtt_path
+
+        await self._request(lambda: self._synthesize_to_files(text, audio_path, vtt_path, rate, pitch))
+        return audio_path, vtt_path
+
+    async def _synthesize_to_files(self, text, audio_path, vtt_path, rate, pitch):
+        """Synthesizes text in one request and writes the narration files. Backends may stream instead."""
+        segment = await self._synthesize_segment(text, rate, pitch)
+        write_segments([segment], audio_path, vtt_path)
+
+    async def synthesize_chunks(self, chunks, audio_path, vtt_path, max_concurrency=4, rate="100%", pitch="+0Hz"):
+        """
+        Synthesizes chunks of text concurrently and stitches them into one narration.
+
+        The MP3 audio of the chunks is concatenated frame by frame, without re-encoding, and the
+        word boundaries of every chunk are shifted by the duration of the audio before it, so the
+        merged subtitles stay in sync.
+
+        :param chunks: Chunks of text in narration order.
+        :param audio_path: The path where the audio file will be saved.
+        :param vtt_path: The path where the VTT file will be saved.
+        :param max_concurrency: Maximum number of chunks synthesized at the same time.
+        :param rate: The speech rate for synthesis (default is "100%").
+        :param pitch: The pitch adjustment for synthesis (default is "+0Hz").
+        :return: Paths to the saved audio and VTT files.
+        """
+        try:
+            await self._write_chunks(
+                chunks, audio_path, vtt_path, max_concurrency, self.validate_rate(rate), self.validate_pitch(pitch)
+            )
+        except Exception as e:
+            logger.error(f"Error in synthesizing speech: {e}")
+            return None, None
+
+        logger.info(f"Synthesized audio saved at: {audio_path} ({len(chunks)} chunks)")
+        return audio_path, vtt_path
+
+    async def _write_chunks(self, chunks, audio_path, vtt_path, max_concurrency, rate, pitch):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def synthesize(chunk):
+            async with semaphore:
+                return await self._cached_segment(chunk, rate, pitch)
+
+        segments = await asyncio.gather(*(synthesize(chunk) for chunk in chunks))
+        write_segments(segments, audio_path, vtt_path)
+
+    async def synthesize_stream(self, text_chunks, folder_path, rate="100%", pitch="+0Hz", max_concurrency=4):
+        """
+        Synthesizes speech from a stream of text while the text is still being generated.
+
+        The stream is split at sentence boundaries and every completed sentence is sent to TTS
+        right away, up to ``max_concurrency`` at a time. The sentence audio and word timings are
+        then stitched together in order into the usual narration files.
+
+        :param text_chunks: Async iterable of text chunks (e.g. a streamed LLM response).
+        :param folder_path: The path where the audio, VTT and text files will be saved.
+        :param rate: The speech rate for synthesis (default is "100%").
+        :param pitch: The pitch adjustment for synthesis (default is "+0Hz").
+        :param max_concurrency: Maximum number of sentences synthesized at the same time.
+        :return: Paths to the saved audio and VTT files.
+        """
+        rate = self.validate_rate(rate)
+        pitch = self.validate_pitch(pitch)
+
+        audio_path = os.path.join(folder_path, 'narration.mp3')
+        vtt_path = os.path.join(folder_path, 'narration.vtt')
+        text_path = os.path.join(folder_path, 'formatted_for_tts.txt')
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def synthesize(sentence):
+            async with semaphore:
+                return await self._cached_segment(sentence, rate, pitch)
+
+        tasks = []
+        try:
+            async for sentence in iter_sentences(text_chunks):
+                tasks.append(asyncio.create_task(synthesize(sentence)))
+            segments = await asyncio.gather(*tasks)
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            logger.error(f"Error in streaming speech synthesis: {e}")
+            return None, None
+
+        if not segments:
+            logger.error("No text received for streaming speech synthesis")
+            return None, None
+
+        # Keep the full text next to the audio, as the non-streaming pipeline does
+        with open(text_path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(segment.text for segment in segments))
+
+        write_segments(segments, audio_path, vtt_path)
+        logger.info(f"Synthesized audio saved at: {audio_path}")
+        return audio_path, vtt_path
+
+    async def _cached_segment(self, text, rate, pitch):
+        """
+        Returns the segment of a piece of text from the cache, synthesizing and caching it on a miss.
+
+        :param text: The text to synthesize.
+        :param rate: The speech rate, part of the cache key.
+        :param pitch: The pitch adjustment, part of the cache key.
+        :return: A Segment with the MP3 audio and the word boundaries of the text.
+        """
+        if self.cache is not None:
+            segment = self.cache.get(text, self.cache_voice, rate, pitch)
+            if segment is not None:
+                return segment
+
+        segment = await self._request(lambda: self._synthesize_segment(text, rate, pitch))
+        if self.cache is not None and segment.audio:
+            self.cache.put(segment, self.cache_voice, rate, pitch)
+        return segment
+
+    async def _synthesize_segment(self, text, rate="100%", pitch="+0Hz"):
+        """
+        Synthesizes one piece of text.
+
+        :param text: The text to synthesize.
+        :param rate: The speech rate for synthesis ("100%" is normal speed).
+        :param pitch: The pitch adjustment for synthesis, e.g. "+0Hz".
+        :return: A Segment with the MP3 audio and the word boundaries of the text.
+        """
+        raise NotImplementedError
+
+    async def _request(self, make_request):
+        """
+        Runs one TTS request within the shared request limit and the timeout, retrying transient errors.
+
+        :param make_request: Callable returning a new coroutine of the request for every attempt.
+        :return: The result of the request.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.request_semaphore or contextlib.nullcontext():
+                    return await asyncio.wait_for(make_request(), self.request_timeout)
+            except self.transient_errors as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+                logger.warning(f"Transient TTS error ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def close(self):
+        """Releases resources held by the backend (worker processes, connections)."""
+
+    @staticmethod
+    def validate_rate(rate):
+        """
+        Validates the rate input to ensure it's in the correct format.
+
+        :param rate: The rate string to validate.
+        :return: A valid rate string.
+        """
+        try:
+            if not rate.endswith('%') or int(rate[:-1]) <= 0:
+                raise ValueError("Invalid rate provided")
+            return rate
+        except ValueError:
+            logger.warning("Invalid rate format. Defaulting to '100%'.")
+            return "100%"  # Default to a valid rate if the input is invalid
+
+    @staticmethod
+    def validate_pitch(pitch):
+        """
+        Validates the pitch input, a signed adjustment in Hz such as "+0Hz" or "-10Hz".
+
+        :param pitch: The pitch string to validate.
+        :return: A valid pitch string.
+        """
+        if isinstance(pitch, str) and re.fullmatch(r'[+-]\d+Hz', pitch):
+            return pitch
+        logger.warning("Invalid pitch format. Defaulting to '+0Hz'.")
+        return "+0Hz"
@@ -2,57 +2,77 @@ import os
 import edge_tts
 import logging
 import asyncio
+import aiohttp
+from edge_tts.exceptions import NoAudioReceived, UnexpectedResponse, UnknownResponse, WebSocketError
+from .base import TTSClient
+from .manifest import write_manifest
+from .segments import Segment
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
-class EdgeTTSClient:
-    def __init__(self, voice="en-US-JennyNeural"):
-        self.voice = voice
+# Errors worth retrying: dropped or refused connections, timeouts and incomplete responses
+TRANSIENT_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    NoAudioReceived,
+    UnexpectedResponse,
+    UnknownResponse,
+    WebSocketError,
+)
 
-    async def synthesize_post(self, text, folder_path, rate="100%"):
+class EdgeTTSClient(TTSClient):
+    """TTS backend using the Microsoft Edge online text-to-speech service."""
+
+    name = "edge"
+    default_voice = "en-US-JennyNeural"
+    default_concurrency = 4
+    transient_errors = TRANSIENT_ERRORS
+
+    def __init__(self, voice="en-US-JennyNeural", **options):
         """
-        Synthesizes speech from the provided text and saves it as an audio file.
-        
-        :param text: The text to synthesize.
-        :param folder_path: The path where the audio file will be saved.
-        :param rate: The speech rate for synthesis (default is "100%").
-        :return: Paths to the saved audio and VTT files.
+        :param voice: Edge TTS voice name.
+        :param options: Options of ``TTSClient`` (cache, request_timeout, max_retries, ...).
         """
-        # Validate the rate
-        rate = self.validate_rate(rate)
-        
-        # Create output file paths
-        audio_path = os.path.join(folder_path, 'narration.mp3')
-        vtt_path = os.path.join(folder_path, 'narration.vtt')
+        super().__init__(voice, **options)
 
+    async def _synthesize_to_files(self, text, audio_path, vtt_path, rate, pitch):
+        """Writes audio chunks to the MP3 file as they arrive and collects the word boundaries in the same pass."""
         # Initialize the TTS communicate object
-        communicate = edge_tts.Communicate(text, voice=self.voice)
+        communicate = edge_tts.Communicate(text, voice=self.voice, rate=self.edge_rate(rate), pitch=pitch)
+        submaker = edge_tts.SubMaker()
+        boundaries = []
 
-        try:
-            # Save the audio
-            await communicate.save(audio_path)
-            logger.info(f"Synthesized audio saved at: {audio_path}")
+        # Stream the audio to disk and collect the word boundaries in the same pass
+        with open(audio_path, "wb") as audio_file:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio_file.write(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    submaker.create_sub((chunk["offset"], chunk["duration"]), chunk["text"])
+                    boundaries.append((chunk["offset"], chunk["duration"], chunk["text"]))
+        logger.info(f"Synthesized audio saved at: {audio_path}")
 
-            # Generate VTT subtitles
-            await self.generate_vtt(text, vtt_path)
+        with open(vtt_path, "w", encoding="utf-8") as file:
+            file.write(submaker.generate_subs())
+        logger.info(f"Subtitles saved at: {vtt_path}")
 
-            return audio_path, vtt_path
-        except Exception as e:
-            logger.error(f"Error in synthesizing speech: {e}")
-            return None, None
+        # Duration and word timings for renderers, so they don't have to decode the audio
+        write_manifest(audio_path, boundaries)
 
     async def generate_vtt(self, text, vtt_path):
         """
         Generates VTT subtitles from the provided text.
-        
+
+        ``synthesize_post`` already writes the subtitles; this is for text whose audio isn't needed.
+
         :param text: The text to synthesize for VTT.
         :param vtt_path: The path where the VTT file will be saved.
         """
         # Initialize the TTS communicate object for VTT generation
         communicate = edge_tts.Communicate(text, voice=self.voice)
         submaker = edge_tts.SubMaker()
-        
+
         async for chunk in communicate.stream():
             if chunk["type"] == "WordBoundary":
                 submaker.create_sub((chunk["offset"], chunk["duration"]), chunk["text"])
@@ -61,21 +81,33 @@ class EdgeTTSClient:
             file.write(submaker.generate_subs())
         logger.info(f"Subtitles saved at: {vtt_path}")
 
+    async def _synthesize_segment(self, text, rate="100%", pitch="+0Hz"):
+        """
+        Synthesizes one piece of text in a single pass, collecting audio and word boundaries together.
+
+        :param text: The text to synthesize.
+        :param rate: The speech rate for synthesis.
+        :param pitch: The pitch adjustment for synthesis.
+        :return: A Segment with the MP3 audio and the word boundaries of the text.
+        """
+        communicate = edge_tts.Communicate(text, voice=self.voice, rate=self.edge_rate(rate), pitch=pitch)
+        audio_chunks = []
+        boundaries = []
+
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio_chunks.append(chunk["data"])
+            elif chunk["type"] == "WordBoundary":
+                boundaries.append((chunk["offset"], chunk["duration"], chunk["text"]))
+
+        return Segment(text, b"".join(audio_chunks), boundaries)
+
     @staticmethod
-    def validate_rate(rate):
+    def edge_rate(rate):
         """
-        Validates the rate input to ensure it's in the correct format.
-        
-        :param rate: The rate string to validate.
-        :return: A valid rate string.
+        Converts a validated rate ("100%" is normal speed) to the relative form Edge TTS expects ("+0%").
         """
-        try:
-            if not rate.endswith('%') or int(rate[:-1]) <= 0:
-                raise ValueError("Invalid rate provided")
-            return rate
-        except ValueError:
-            logger.warning("Invalid rate format. Defaulting to '100%'.")
-            return "100%"  # Default to a valid rate if the input is invalid
+        return f"{int(rate[:-1]) - 100:+d}%"
 
 # Example of usage
 if __name__ == "__main__":
@@ -86,4 +118,4 @@ if __name__ == "__main__":
         os.makedirs(folder_path, exist_ok=True)
         await tts_client.synthesize_post(text, folder_path)
 
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+import os
+import asyncio
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from .base import TTSClient
+from .segments import Segment
+
+logger = logging.getLogger(__name__)
+
+# espeak-ng speaks about 175 words per minute at its default speed
+ESPEAK_DEFAULT_WORDS_PER_MINUTE = 175
+ESPEAK_DEFAULT_PITCH = 50
+
+# Encoded like the Edge TTS output (24 kHz mono MP3 at 48 kbit/s, no ID3 tag or Xing frame), so
+# segments of both backends can be concatenated and measured the same way
+FFMPEG_MP3_OPTIONS = [
+    '-ac', '1', '-ar', '24000', '-b:a', '48k',
+    '-id3v2_version', '0', '-write_xing', '0', '-f', 'mp3'
+]
+
+
+def estimate_word_boundaries(text, duration):
+    """
+    Spread the words of a text over its audio in proportion to their length.
+
+    espeak-class engines don't report word timings, so they are estimated. Text is synthesized
+    in chunks of whole sentences, which keeps the error within one chunk.
+
+    :param text: The synthesized text
+    :param duration: Duration of its audio in ticks (100 ns)
+    :return: List of ``(offset, duration, word)`` tuples in ticks
+    """
+    words = text.split()
+    # Each word is weighted by its characters plus one for the pause after it
+    weights = [len(word) + 1 for word in words]
+    total = sum(weights)
+    boundaries = []
+    offset = 0
+    for word, weight in zip(words, weights):
+        length = duration * weight // total
+        boundaries.append((offset, length * len(word) // weight, word))
+        offset += length
+    return boundaries
+
+
+def _synthesize_with_espeak(text, voice, words_per_minute, pitch, executable, ffmpeg):
+    """Synthesize text with espeak-ng and encode it to MP3 (runs in a worker process)."""
+    wav = subprocess.run(
+        [executable, '-v', voice, '-s', str(words_per_minute), '-p', str(pitch), '-b', '1', '--stdout'],
+        input=text.encode('utf-8'), capture_output=True, check=True
+    ).stdout
+    return subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0', *FFMPEG_MP3_OPTIONS, 'pipe:1'],
+        input=wav, capture_output=True, check=True
+    ).stdout
+
+
+class LocalTTSClient(TTSClient):
+    """
+    TTS backend running espeak-ng on this machine, spread over a process pool.
+
+    It needs no network, and narration throughput scales with the number of cores. Output goes
+    through the same pipeline as the Edge backend (narration.mp3, narration.vtt and
+    narration.json), with word timings estimated from word lengths.
+    """
+
+    name = "local"
+    default_voice = "en-us"
+    default_concurrency = os.cpu_count() or 1
+
+    def __init__(self, voice="en-us", executable="espeak-ng", ffmpeg="ffmpeg", processes=None, **options):
+        """
+        :param voice: espeak-ng voice name, e.g. "en-us" or "en-gb+f3".
+        :param executable: espeak-ng executable ("espeak" works too).
+        :param ffmpeg: ffmpeg executable used to encode the audio to MP3.
+        :param processes: Number of worker processes (default None uses one per core).
+        :param options: Options of ``TTSClient`` (cache, request_timeout, max_retries, ...).
+        """
+        super().__init__(voice, **options)
+        self.executable = executable
+        self.ffmpeg = ffmpeg
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = None
+
+    async def _synthesize_segment(self, text, rate="100%", pitch="+0Hz"):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+
+        audio = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            _synthesize_with_espeak,
+            text, self.voice, self.espeak_speed(rate), self.espeak_pitch(pitch), self.executable, self.ffmpeg
+        )
+        segment = Segment(text, audio)
+        segment.boundaries = estimate_word_boundaries(text, segment.duration)
+        return segment
+
+    def close(self):
+        """Shuts down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def espeak_speed(rate):
+        """Converts a validated rate ("100%" is normal speed) to espeak-ng words per minute."""
+        return round(ESPEAK_DEFAULT_WORDS_PER_MINUTE * int(rate[:-1]) / 100)
+
+    @staticmethod
+    def espeak_pitch(pitch):
+        """Converts a validated pitch adjustment ("+0Hz") to the espeak-ng pitch scale (0-99, 50 is normal)."""
+        return min(99, max(0, ESPEAK_DEFAULT_PITCH + int(pitch[:-2])))
@@ -0,0 +1,75 @@
+import os
+import json
+import logging
+from .audio import TICKS_PER_SECOND, mp3_info
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(audio_path):
+    """Path of the manifest that belongs to an audio file (``narration.mp3`` -> ``narration.json``)."""
+    return f"{os.path.splitext(audio_path)[0]}.json"
+
+
+def write_manifest(audio_path, boundaries):
+    """
+    Write the narration manifest next to an audio file.
+
+    The manifest lets renderers plan their timeline without decoding the audio or parsing the VTT
+    file. Format::
+
+        {
+            "version": 1,
+            "audio": "narration.mp3",     # File name, relative to the manifest
+            "audio_bytes": 123456,        # Size of the audio file, to detect a stale manifest
+            "duration": 61.344,           # Seconds, measured from the MP3 frames
+            "sample_rate": 24000,
+            "words": [[0.1, 0.42, "Hello"], ...]   # Start and end in seconds, and the word
+        }
+
+    :param audio_path: Path of the MP3 file
+    :param boundaries: Word boundaries as ``(offset, duration, word)`` tuples in ticks (100 ns)
+    :return: Path of the manifest
+    """
+    with open(audio_path, 'rb') as audio_file:
+        data = audio_file.read()
+    duration, sample_rate, _ = mp3_info(data)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'audio': os.path.basename(audio_path),
+        'audio_bytes': len(data),
+        'duration': round(duration, 3),
+        'sample_rate': sample_rate,
+        'words': [
+            [round(offset / TICKS_PER_SECOND, 3), round((offset + length) / TICKS_PER_SECOND, 3), word]
+            for offset, length, word in boundaries
+        ]
+    }
+
+    path = manifest_path_for(audio_path)
+    with open(path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False, separators=(',', ':'))
+    logger.info(f"Narration manifest saved at: {path}")
+    return path
+
+
+def load_manifest(audio_path):
+    """
+    Load the manifest of an audio file.
+
+    :return: The manifest dictionary, or None if there is none or the audio changed since it was written
+    """
+    path = manifest_path_for(audio_path)
+    try:
+        with open(path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+        audio_bytes = os.path.getsize(audio_path)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('audio_bytes') != audio_bytes:
+        logger.warning(f"Ignoring stale narration manifest {path}")
+        return None
+    return manifest
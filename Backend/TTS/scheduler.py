@@ -0,0 +1,117 @@
+import time
+import asyncio
+import logging
+from .audio import mp3_info
+from .backends import create_tts_client
+from .segments import DEFAULT_CHUNK_CHARS
+
+logger = logging.getLogger(__name__)
+
+
+class TTSBatchScheduler:
+    """
+    Synthesizes the narrations of a batch of posts at a bounded, steady rate.
+
+    All posts share one cap on the TTS requests in flight, so a batch of fifty posts opens no more
+    TTS sessions than a batch of five. Every request has a timeout and transient failures
+    (dropped connections, timeouts, missing audio) are retried with exponential backoff and full
+    jitter. A post that still fails is reported; it doesn't stop the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        backend="edge",
+        voice=None,
+        cache=None,
+        max_concurrency=None,
+        request_timeout=120,
+        max_retries=3,
+        backoff_base=2.0,
+        rate="100%",
+        pitch="+0Hz",
+        chunk_chars=DEFAULT_CHUNK_CHARS
+    ):
+        """
+        :param backend: TTS backend name ("edge" or "local", see ``TTS_BACKENDS``)
+        :param voice: Voice name of the backend (default: the backend's default voice)
+        :param cache: Optional TTSCache shared by the batch
+        :param max_concurrency: Maximum number of TTS requests in flight across all posts
+                                (default: the backend's ``default_concurrency``)
+        :param request_timeout: Seconds one TTS request may take before it is retried
+        :param max_retries: Number of retries of a failed TTS request
+        :param backoff_base: Upper bound in seconds of the first retry delay; it doubles on every retry
+        :param rate: Speech rate ("100%" is normal speed)
+        :param pitch: Pitch adjustment, e.g. "+0Hz"
+        :param chunk_chars: Maximum characters per TTS request for long narrations
+        """
+        self.backend = backend
+        self.voice = voice
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.rate = rate
+        self.pitch = pitch
+        self.chunk_chars = chunk_chars
+
+    async def run(self, jobs):
+        """
+        Synthesize a batch of narrations.
+
+        :param jobs: Iterable of ``(post_id, text, folder_path)`` tuples
+        :return: List of per-post reports (dictionaries with ``post_id``, ``ok``, ``audio_path``,
+                 ``vtt_path``, ``seconds``, ``audio_seconds`` and ``error``), in job order
+        """
+        client = create_tts_client(
+            self.backend,
+            voice=self.voice,
+            cache=self.cache,
+            request_timeout=self.request_timeout,
+            max_retries=self.max_retries,
+            backoff_base=self.backoff_base
+        )
+        max_concurrency = self.max_concurrency or client.default_concurrency
+        # The semaphore belongs to this event loop, so it is created per run
+        client.request_semaphore = asyncio.Semaphore(max_concurrency)
+
+        started = time.perf_counter()
+        try:
+            reports = await asyncio.gather(*(self._run_job(client, max_concurrency, *job) for job in jobs))
+        finally:
+            client.close()
+        elapsed = time.perf_counter() - started
+
+        succeeded = [report for report in reports if report['ok']]
+        audio_seconds = sum(report['audio_seconds'] for report in succeeded)
+        logger.info(
+            f"Synthesized {len(succeeded)} of {len(reports)} narrations in {elapsed:.1f}s "
+            f"({audio_seconds:.0f}s of audio, {audio_seconds / elapsed if elapsed else 0:.1f}x real time)"
+        )
+        for report in reports:
+            if not report['ok']:
+                logger.error(f"Narration failed for post {report['post_id']} after {report['seconds']:.1f}s: {report['error']}")
+        return reports
+
+    async def _run_job(self, client, max_concurrency, post_id, text, folder_path):
+        report = {
+            'post_id': post_id,
+            'ok': False,
+            'audio_path': None,
+            'vtt_path': None,
+            'seconds': 0.0,
+            'audio_seconds': 0.0,
+            'error': None
+        }
+        started = time.perf_counter()
+        try:
+            audio_path, vtt_path = await client.synthesize_to_files(
+                text, folder_path, self.rate, self.pitch, self.chunk_chars, max_concurrency
+            )
+            with open(audio_path, 'rb') as audio_file:
+                report['audio_seconds'] = mp3_info(audio_file.read())[0]
+            report.update(ok=True, audio_path=audio_path, vtt_path=vtt_path)
+        except Exception as e:
+            report['error'] = f"{type(e).__name__}: {e}"
+        report['seconds'] = time.perf_counter() - started
+        return report
@@ -0,0 +1,115 @@
+import re
+import logging
+from dataclasses import dataclass, field
+import edge_tts
+from .audio import mp3_duration_ticks
+from .manifest import write_manifest
+
+logger = logging.getLogger(__name__)
+
+# End of a sentence: terminal punctuation (optionally followed by a closing quote or bracket)
+# and whitespace, or a line break. The labels the LLM writes (POST_TITLE, COMMENT_1 ...) sit on
+# their own lines, so line breaks are treated as boundaries too.
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…]["\')\]])\s+|(?<=[.!?…])\s+|\n+')
+
+# Characters of text per TTS request when a narration is synthesized in parallel chunks
+DEFAULT_CHUNK_CHARS = 1000
+
+
+@dataclass(slots=True)
+class Segment:
+    """
+    Synthesized audio for one piece of text.
+
+    ``boundaries`` holds ``(offset, duration, word)`` tuples in Edge TTS ticks (100 ns),
+    relative to the start of the segment's own audio.
+    """
+
+    text: str
+    audio: bytes
+    boundaries: list = field(default_factory=list)
+    duration: int = None
+
+    def __post_init__(self):
+        if self.duration is None:
+            self.duration = mp3_duration_ticks(self.audio)
+
+
+def split_sentences(text):
+    """Split text into sentences (non-empty, stripped)."""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def split_chunks(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """
+    Split text into chunks of whole sentences, each at most ``max_chars`` long where possible.
+
+    Sentences are packed greedily in order; a sentence longer than ``max_chars`` becomes a chunk
+    of its own. Line breaks between sentences are kept, so labels on their own lines stay there.
+
+    :return: List of non-empty chunks; joining them reproduces the sentences of the text in order
+    """
+    chunks = []
+    chunk = ''
+    for line in text.splitlines():
+        for index, sentence in enumerate(split_sentences(line)):
+            separator = ' ' if index else '\n'
+            if chunk and len(chunk) + len(separator) + len(sentence) > max_chars:
+                chunks.append(chunk)
+                chunk = ''
+            chunk = f"{chunk}{separator}{sentence}" if chunk else sentence
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+async def iter_sentences(chunks):
+    """
+    Turn an async stream of text chunks into a stream of complete sentences.
+
+    A sentence is yielded as soon as the boundary after it has arrived; whatever remains when the
+    stream ends is yielded last.
+
+    :param chunks: Async iterable of text chunks (e.g. a streamed LLM response)
+    """
+    buffer = ''
+    async for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_BOUNDARY.split(buffer)
+        # The last part may still be growing; keep it until its boundary shows up
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def write_segments(segments, audio_path, vtt_path):
+    """
+    Stitch segments into one MP3 file and one VTT file, plus the narration manifest.
+
+    The MP3 frames of the segments are concatenated as they are (no re-encoding), and every word
+    boundary is shifted by the duration of the audio before its segment so the subtitles stay in
+    sync with the merged narration.
+
+    :param segments: Segments in narration order
+    :return: Total duration of the narration in ticks
+    """
+    submaker = edge_tts.SubMaker()
+    boundaries = []
+    elapsed = 0
+    with open(audio_path, 'wb') as audio_file:
+        for segment in segments:
+            audio_file.write(segment.audio)
+            for offset, duration, word in segment.boundaries:
+                submaker.create_sub((elapsed + offset, duration), word)
+                boundaries.append((elapsed + offset, duration, word))
+            elapsed += segment.duration
+
+    with open(vtt_path, 'w', encoding='utf-8') as vtt_file:
+        vtt_file.write(submaker.generate_subs())
+    write_manifest(audio_path, boundaries)
+
+    logger.info(f"Stitched {len(segments)} segments into {audio_path} and {vtt_path}")
+    return elapsed
@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+import logging
+from .audio import TICKS_PER_SECOND
+from .segments import Segment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join('Backend', 'data', 'tts_cache.sqlite3')
+
+
+def normalize_text(text):
+    """Normalize sentence text for cache lookups (Unicode form and whitespace)."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+class TTSCache:
+    """
+    Disk-backed cache of synthesized text keyed by normalized text, voice, rate and pitch.
+
+    Each entry holds the MP3 audio of a chunk or a streamed sentence and its word boundaries, so a
+    narration can be assembled from cached pieces and only new or rewritten ones need to be synthesized.
+    The total size of the cached audio is bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_bytes=500 * 1024 * 1024):
+        """
+        :param db_path: Path of the SQLite database file (created if missing)
+        :param max_bytes: Maximum total size of the cached audio
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_ticks = 0  # Audio served from the cache instead of being synthesized
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                voice TEXT,
+                audio BLOB,
+                boundaries TEXT,
+                duration INTEGER,
+                size INTEGER,
+                last_access REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS segments_last_access ON segments (last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+
+    @staticmethod
+    def key(text, voice, rate, pitch="+0Hz"):
+        """Cache key of text synthesized with a voice, rate and pitch."""
+        return hashlib.sha256(f"{voice}\x00{rate}\x00{pitch}\x00{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get(self, text, voice, rate, pitch="+0Hz"):
+        """
+        Look up synthesized text.
+
+        :return: A Segment with the cached audio and word boundaries, or None on a miss
+        """
+        key = self.key(text, voice, rate, pitch)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audio, boundaries, duration FROM segments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE segments SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            self.saved_ticks += row[2]
+
+        boundaries = [tuple(boundary) for boundary in json.loads(row[1])]
+        return Segment(text, row[0], boundaries, row[2])
+
+    def put(self, segment, voice, rate, pitch="+0Hz"):
+        """Store a synthesized segment and evict the least recently used entries beyond ``max_bytes``."""
+        key = self.key(segment.text, voice, rate, pitch)
+        size = len(segment.audio)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM segments WHERE key = ?", (key,)).fetchone()
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO segments (key, voice, audio, boundaries, duration, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, voice, segment.audio, json.dumps(segment.boundaries), segment.duration, size, time.time())
+            )
+            self._total_bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM segments ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._total_bytes -= size
+            evicted.append((key,))
+        self._conn.executemany("DELETE FROM segments WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} cached TTS segments")
+
+    def clear(self):
+        """Remove all cached segments."""
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Hit/miss counters, hit rate, seconds of audio served from the cache and current size of the cache."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'saved_audio_seconds': self.saved_ticks / TICKS_PER_SECOND,
+            'entries': entries,
+            'bytes': self._total_bytes
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
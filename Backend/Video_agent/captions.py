@@ -0,0 +1,360 @@
+# Backend/Video_agent/captions.py
+
+import logging
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+# Fonts tried in order for captions; the first one found is used
+CAPTION_FONT_CANDIDATES = [
+    'arialbd.ttf', 'C:\\Windows\\Fonts\\arialbd.ttf', 'DejaVuSans-Bold.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', '/Library/Fonts/Arial Bold.ttf'
+]
+
+# Caption styling shared by the ASS and the NumPy renderers
+CAPTION_STYLE = {
+    'font_name': 'Arial',  # Font family libass looks up for ASS captions
+    'font_size': 64,
+    'text_color': (255, 255, 255),
+    'highlight_color': (255, 221, 0),  # Color of words already spoken in karaoke mode
+    'outline_color': (0, 0, 0),
+    'outline_width': 4,
+    'bottom_margin': 240,  # Pixels between the bottom of the frame and the caption
+    'max_width_ratio': 0.85,  # Captions wrap to this fraction of the frame width
+    'line_spacing': 1.15,
+}
+
+# Punctuation that ends a phrase
+PHRASE_END = ('.', '!', '?', ',', ';', ':', '…')
+
+
+def _vtt_seconds(timestamp):
+    """Convert a WebVTT timestamp ([HH:]MM:SS.mmm) to seconds."""
+    seconds = 0.0
+    for part in timestamp.replace(',', '.').split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def read_vtt_words(vtt_path):
+    """
+    Read word timings from a WebVTT file, for narrations without a manifest.
+
+    Cues holding several words have their time span shared out in proportion to the word lengths.
+
+    :return: List of ``[start, end, word]`` timings in seconds
+    """
+    with open(vtt_path, 'r', encoding='utf-8') as vtt_file:
+        blocks = vtt_file.read().replace('\r\n', '\n').split('\n\n')
+
+    words = []
+    for block in blocks:
+        lines = [line.strip() for line in block.strip().split('\n')]
+        for index, line in enumerate(lines):
+            if '-->' not in line:
+                continue
+            start, end = (_vtt_seconds(value.split()[0]) for value in line.split('-->'))
+            cue_words = " ".join(lines[index + 1:]).split()
+            span = end - start
+            total = sum(len(word) + 1 for word in cue_words)
+            for word in cue_words:
+                length = span * (len(word) + 1) / total
+                words.append([start, start + length, word])
+                start += length
+            break
+    return words
+
+
+def group_phrases(words, max_words=4, max_chars=24, max_gap=0.35):
+    """
+    Group word timings into short caption phrases.
+
+    A phrase ends after punctuation, before a pause longer than ``max_gap`` seconds, or when it
+    reaches ``max_words`` words or ``max_chars`` characters.
+
+    :param words: List of ``[start, end, word]`` timings in seconds (as in narration.json)
+    :return: List of phrases, each a list of ``(start, end, word)`` tuples
+    """
+    phrases = []
+    phrase = []
+    for start, end, word in words:
+        if phrase:
+            length = sum(len(w) + 1 for _, _, w in phrase) + len(word)
+            if start - phrase[-1][1] > max_gap or len(phrase) >= max_words or length > max_chars:
+                phrases.append(phrase)
+                phrase = []
+        phrase.append((start, end, word))
+        if word.endswith(PHRASE_END):
+            phrases.append(phrase)
+            phrase = []
+    if phrase:
+        phrases.append(phrase)
+    return phrases
+
+
+def _ass_color(rgb, alpha=0):
+    """Convert an RGB tuple to an ASS colour (&HAABBGGRR)."""
+    red, green, blue = rgb
+    return f"&H{alpha:02X}{blue:02X}{green:02X}{red:02X}"
+
+
+def _ass_time(seconds):
+    """Format seconds as an ASS timestamp (H:MM:SS.cc)."""
+    centiseconds = max(0, round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    seconds, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{centiseconds:02d}"
+
+
+def _ass_escape(text):
+    return text.replace('\\', '\\\\').replace('{', '(').replace('}', ')')
+
+
+def write_ass(phrases, path, size, style=None, karaoke=True, offset=0.0):
+    """
+    Write caption phrases as a styled ASS subtitle track, for ffmpeg to burn in with libass.
+
+    In karaoke mode every word carries a ``\\k`` tag, so libass switches it from the text color to
+    the highlight color when it is spoken, without rendering an image per word.
+
+    :param phrases: Phrases as returned by ``group_phrases``
+    :param path: Path of the .ass file to write
+    :param size: (width, height) of the video
+    :param style: Dictionary overriding entries of ``CAPTION_STYLE``
+    :param karaoke: Highlight words as they are spoken
+    :param offset: Seconds added to every timing (e.g. the length of a title card before the narration)
+    :return: ``path``
+    """
+    style = {**CAPTION_STYLE, **(style or {})}
+    width, height = size
+    margin = round(width * (1 - style['max_width_ratio']) / 2)
+
+    # With \k tags libass draws not-yet-spoken words in SecondaryColour and spoken ones in PrimaryColour
+    primary = style['highlight_color'] if karaoke else style['text_color']
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Caption,{style['font_name']},{style['font_size']},{_ass_color(primary)},"
+        f"{_ass_color(style['text_color'])},{_ass_color(style['outline_color'])},{_ass_color((0, 0, 0), 255)},"
+        f"-1,0,0,0,100,100,0,0,1,{style['outline_width']},0,2,{margin},{margin},{style['bottom_margin']},1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+
+    for phrase in phrases:
+        start = phrase[0][0]
+        end = phrase[-1][1]
+        if karaoke:
+            parts = []
+            for index, (word_start, word_end, word) in enumerate(phrase):
+                # Each \k lasts until the next word starts, so pauses stay on the spoken word
+                next_start = phrase[index + 1][0] if index + 1 < len(phrase) else word_end
+                if index == 0 and word_start > start:
+                    parts.append(f"{{\\k{round((word_start - start) * 100)}}}")
+                parts.append(f"{{\\k{max(1, round((next_start - word_start) * 100))}}}{_ass_escape(word)}")
+            text = " ".join(parts)
+        else:
+            text = " ".join(_ass_escape(word) for _, _, word in phrase)
+        lines.append(f"Dialogue: 0,{_ass_time(start + offset)},{_ass_time(end + offset)},Caption,,0,0,0,,{text}")
+
+    with open(path, 'w', encoding='utf-8') as ass_file:
+        ass_file.write("\n".join(lines) + "\n")
+    logger.info(f"Saved {len(phrases)} caption phrases to {path}")
+    return path
+
+
+class GlyphAtlas:
+    """
+    Glyph masks of one font, rendered once per character and reused for every caption.
+
+    Each entry holds the fill and outline coverage of a character as float arrays, so a caption
+    is composed by pasting arrays instead of asking a text renderer for a new image.
+    """
+
+    def __init__(self, font_size, outline_width):
+        self.font = self._load_font(font_size)
+        self.outline_width = outline_width
+        if hasattr(self.font, 'getmetrics'):
+            ascent, descent = self.font.getmetrics()
+        else:  # The bitmap default font of Pillow before 10.1 has no metrics
+            ascent, descent = self.font.getbbox("Ag")[3], 0
+        self.line_height = ascent + descent + 2 * outline_width
+        self._glyphs = {}
+
+    @staticmethod
+    def _load_font(size):
+        for candidate in CAPTION_FONT_CANDIDATES:
+            try:
+                return ImageFont.truetype(candidate, size)
+            except OSError:
+                continue
+        logger.warning("No TrueType font found for captions, using Pillow's default font")
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:  # Pillow before 10.1 only has the fixed-size bitmap font
+            return ImageFont.load_default()
+
+    def glyph(self, char):
+        """Return ``(fill, outline, advance)`` for a character, rendering it on first use."""
+        if char not in self._glyphs:
+            advance = self.font.getlength(char)
+            width = int(np.ceil(advance)) + 2 * self.outline_width + 2
+            size = (max(width, 1), self.line_height)
+            origin = (self.outline_width, self.outline_width)
+
+            fill = Image.new('L', size, 0)
+            ImageDraw.Draw(fill).text(origin, char, font=self.font, fill=255)
+            outline = Image.new('L', size, 0)
+            ImageDraw.Draw(outline).text(
+                origin, char, font=self.font, fill=255, stroke_width=self.outline_width, stroke_fill=255
+            )
+            self._glyphs[char] = (
+                np.asarray(fill, dtype=np.float32) / 255,
+                np.asarray(outline, dtype=np.float32) / 255,
+                advance
+            )
+        return self._glyphs[char]
+
+    def text_width(self, text):
+        return sum(self.glyph(char)[2] for char in text)
+
+
+class CaptionRenderer:
+    """
+    Renders caption phrases for moviepy from a glyph atlas, composited with NumPy.
+
+    A frame only changes when a phrase starts or a word gets highlighted, so rendered frames are
+    cached per (phrase, number of highlighted words): a whole video needs one small composition
+    per word instead of one ImageMagick ``TextClip`` per cue.
+    """
+
+    def __init__(self, width, style=None, karaoke=True):
+        """
+        :param width: Width of the video in pixels
+        :param style: Dictionary overriding entries of ``CAPTION_STYLE``
+        :param karaoke: Highlight words as they are spoken
+        """
+        self.style = {**CAPTION_STYLE, **(style or {})}
+        self.width = width
+        self.karaoke = karaoke
+        self.atlas = GlyphAtlas(self.style['font_size'], self.style['outline_width'])
+        self.line_step = round(self.atlas.line_height * self.style['line_spacing'])
+        self.render_phrase = lru_cache(maxsize=256)(self._render_phrase)
+
+    def _layout(self, words):
+        """Wrap words into lines within the caption width; returns lists of word indexes."""
+        max_width = self.width * self.style['max_width_ratio']
+        space = self.atlas.text_width(' ')
+        lines = [[]]
+        line_width = 0
+        for index, word in enumerate(words):
+            word_width = self.atlas.text_width(word)
+            if lines[-1] and line_width + space + word_width > max_width:
+                lines.append([])
+                line_width = 0
+            line_width += (space if lines[-1] else 0) + word_width
+            lines[-1].append(index)
+        return lines
+
+    def _render_phrase(self, words, highlighted):
+        """
+        Compose one caption image.
+
+        :param words: Tuple of the words of the phrase
+        :param highlighted: Number of leading words drawn in the highlight color
+        :return: ``(rgb, alpha)`` arrays of shape (height, width, 3) and (height, width)
+        """
+        lines = self._layout(words)
+        height = self.line_step * (len(lines) - 1) + self.atlas.line_height
+        fill = np.zeros((height, self.width), dtype=np.float32)
+        outline = np.zeros((height, self.width), dtype=np.float32)
+        highlight = np.zeros((height, self.width), dtype=bool)
+        space = self.atlas.text_width(' ')
+
+        for line_number, line in enumerate(lines):
+            line_text = " ".join(words[index] for index in line)
+            x = (self.width - self.atlas.text_width(line_text)) / 2
+            y = line_number * self.line_step
+            for index in line:
+                word_start = x
+                for char in words[index]:
+                    glyph_fill, glyph_outline, advance = self.atlas.glyph(char)
+                    left = int(round(x)) - self.atlas.outline_width
+                    glyph_height, glyph_width = glyph_fill.shape
+                    # Clip glyphs that would stick out of the frame
+                    x0, x1 = max(left, 0), min(left + glyph_width, self.width)
+                    if x1 > x0:
+                        region = (slice(y, y + glyph_height), slice(x0, x1))
+                        columns = slice(x0 - left, x1 - left)
+                        np.maximum(fill[region], glyph_fill[:, columns], out=fill[region])
+                        np.maximum(outline[region], glyph_outline[:, columns], out=outline[region])
+                    x += advance
+                if index < highlighted:
+                    highlight[y:y + self.atlas.line_height, max(int(word_start), 0):min(int(np.ceil(x)), self.width)] = True
+                x += space
+
+        text_color = np.array(self.style['text_color'], dtype=np.float32)
+        highlight_color = np.array(self.style['highlight_color'], dtype=np.float32)
+        outline_color = np.array(self.style['outline_color'], dtype=np.float32)
+
+        color = np.where(highlight[..., None], highlight_color, text_color)
+        rgb = outline_color * (1 - fill[..., None]) + color * fill[..., None]
+        alpha = np.maximum(fill, outline)
+        return rgb.astype(np.uint8), alpha
+
+    def frame_at(self, phrases, t):
+        """
+        Caption image at time ``t``, or None when no phrase is on screen.
+
+        :return: ``(rgb, alpha)`` as returned by ``render_phrase``
+        """
+        for phrase in phrases:
+            if phrase[0][0] <= t < phrase[-1][1]:
+                words = tuple(word for _, _, word in phrase)
+                highlighted = sum(1 for start, _, _ in phrase if start <= t) if self.karaoke else 0
+                return self.render_phrase(words, highlighted)
+        return None
+
+    def make_clip(self, phrases, duration, offset=0.0):
+        """
+        Build a moviepy clip (with a mask) that shows the captions over a video.
+
+        :param phrases: Phrases as returned by ``group_phrases``
+        :param duration: Length of the clip in seconds
+        :param offset: Seconds to shift every phrase by (e.g. the length of a title card)
+        :return: A VideoClip as wide as the video and as tall as the tallest caption
+        """
+        from moviepy.editor import VideoClip
+
+        phrases = [[(start + offset, end + offset, word) for start, end, word in phrase] for phrase in phrases]
+        height = max(
+            (self.render_phrase(tuple(word for _, _, word in phrase), 0)[0].shape[0] for phrase in phrases),
+            default=self.atlas.line_height
+        )
+
+        def padded(t):
+            frame = self.frame_at(phrases, t)
+            rgb = np.zeros((height, self.width, 3), dtype=np.uint8)
+            alpha = np.zeros((height, self.width), dtype=np.float32)
+            if frame is not None:
+                # Align captions to the bottom so multi-line phrases grow upwards
+                rgb[height - frame[0].shape[0]:] = frame[0]
+                alpha[height - frame[1].shape[0]:] = frame[1]
+            return rgb, alpha
+
+        clip = VideoClip(lambda t: padded(t)[0], duration=duration)
+        mask = VideoClip(lambda t: padded(t)[1], ismask=True, duration=duration)
+        return clip.set_mask(mask)
@@ -0,0 +1,192 @@
+# Backend/Video_agent/ffmpeg_render.py
+
+import os
+import logging
+import subprocess
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+# Fonts tried in order for title cards; the first one found is used
+TITLE_FONT_CANDIDATES = [
+    'arial.ttf', 'C:\\Windows\\Fonts\\arial.ttf', 'DejaVuSans.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/Library/Fonts/Arial.ttf'
+]
+
+# Encoder settings used when a render doesn't override them
+DEFAULT_ENCODER_OPTIONS = {
+    "fps": 30,
+    "preset": "medium",
+    "crf": "18",
+    "bitrate": None,  # Set to e.g. "5000k" to encode at a target bitrate instead of a constant quality
+    "audio_bitrate": "192k",
+    "threads": 0,  # 0 lets x264 pick a thread count for the machine
+}
+
+
+def escape_filter_path(path):
+    """Escape a file path for use as an option value inside an ffmpeg filter graph."""
+    path = os.path.abspath(path).replace('\\', '/')
+    return path.replace(':', '\\:').replace("'", "\\'")
+
+
+def probe_duration(path, ffprobe="ffprobe"):
+    """Duration of a media file in seconds, read from its container by ffprobe."""
+    output = subprocess.run(
+        [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', path],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip())
+
+
+def render_title_card(title_text, size, output_path, fontsize=50, bg_color=(0, 0, 0), text_color='white'):
+    """
+    Draw a full-frame title card (text centered on a solid background) as an image.
+
+    :param size: (width, height) of the frame
+    :return: Path of the saved image
+    """
+    font = None
+    for candidate in TITLE_FONT_CANDIDATES:
+        try:
+            font = ImageFont.truetype(candidate, fontsize)
+            break
+        except OSError:
+            continue
+    if font is None:
+        try:
+            font = ImageFont.load_default(fontsize)
+        except TypeError:  # Pillow before 10.1 only has the fixed-size bitmap font
+            font = ImageFont.load_default()
+
+    # Wrap the title to the frame width
+    max_width = size[0] * 0.9
+    lines = []
+    for word in title_text.split():
+        if lines and font.getlength(f"{lines[-1]} {word}") <= max_width:
+            lines[-1] = f"{lines[-1]} {word}"
+        else:
+            lines.append(word)
+
+    card = Image.new('RGB', size, bg_color)
+    draw = ImageDraw.Draw(card)
+    draw.multiline_text(
+        (size[0] / 2, size[1] / 2), "\n".join(lines), font=font, fill=text_color, anchor='mm', align='center'
+    )
+    card.save(output_path)
+    return output_path
+
+
+def build_ffmpeg_command(
+    output_path,
+    size,
+    duration=None,
+    background_path=None,
+    background_anchor='center',
+    loop_background=True,
+    overlays=(),
+    audio_path=None,
+    subtitles_path=None,
+    encoder_options=None,
+    ffmpeg="ffmpeg"
+):
+    """
+    Compile a layout into a single ffmpeg invocation with one ``filter_complex`` graph.
+
+    The background is scaled to cover the frame and cropped, the overlays are scaled and placed
+    on top of it in order, subtitles are burned in last and the audio is muxed in, all in one
+    decode/encode pass without any per-frame work in Python.
+
+    :param output_path: Path of the video to write
+    :param size: (width, height) of the output; both must be even
+    :param duration: Length of the video in seconds (None ends it with the background video)
+    :param background_path: Background video, or None for a black background
+    :param background_anchor: Where the cover crop is taken from: 'center' or 'left'
+    :param loop_background: Loop a background video that is shorter than ``duration``
+    :param overlays: Dictionaries with ``path`` (image), ``x`` and ``y`` (pixels or ffmpeg expressions
+                     such as ``(W-w)/2``), and optionally ``width``, ``start`` and ``end`` in seconds
+    :param audio_path: Audio track to mux in
+    :param subtitles_path: Subtitle file (ASS, SRT or WebVTT) to burn in
+    :param encoder_options: Dictionary overriding entries of ``DEFAULT_ENCODER_OPTIONS``
+    :param ffmpeg: ffmpeg executable
+    :return: The command as a list of arguments
+    """
+    if duration is None and not background_path:
+        raise ValueError("A render without a background video needs a duration")
+
+    options = {**DEFAULT_ENCODER_OPTIONS, **(encoder_options or {})}
+    width, height = size
+    fps = options["fps"]
+
+    inputs = []
+    filters = []
+
+    if background_path:
+        if loop_background and duration is not None:
+            inputs += ['-stream_loop', '-1']
+        inputs += ['-i', background_path]
+        crop_x = '(iw-ow)/2' if background_anchor == 'center' else '0'
+        filters.append(
+            f"[0:v]scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height}:{crop_x}:(ih-oh)/2,setsar=1,fps={fps}[base0]"
+        )
+    else:
+        inputs += ['-f', 'lavfi', '-i', f"color=c=black:s={width}x{height}:r={fps}"]
+        filters.append("[0:v]setsar=1[base0]")
+
+    for index, overlay in enumerate(overlays):
+        input_index = index + 1
+        inputs += ['-loop', '1', '-framerate', str(fps), '-i', overlay['path']]
+        scale = f"scale={overlay['width']}:-2," if overlay.get('width') else ""
+        filters.append(f"[{input_index}:v]{scale}format=rgba[overlay{index}]")
+
+        enable = ""
+        if overlay.get('start') is not None or overlay.get('end') is not None:
+            start = overlay.get('start') or 0
+            end = overlay.get('end') if overlay.get('end') is not None else 1e9
+            enable = f":enable='between(t,{start},{end})'"
+        filters.append(
+            f"[base{index}][overlay{index}]overlay=x={overlay['x']}:y={overlay['y']}:shortest=1{enable}[base{index + 1}]"
+        )
+
+    last = f"base{len(overlays)}"
+    if subtitles_path:
+        filters.append(f"[{last}]subtitles=filename='{escape_filter_path(subtitles_path)}'[subtitled]")
+        last = "subtitled"
+    filters.append(f"[{last}]format=yuv420p[video]")
+
+    command = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', *inputs]
+    if audio_path:
+        command += ['-i', audio_path]
+
+    command += ['-filter_complex', ';'.join(filters), '-map', '[video]']
+    if audio_path:
+        command += ['-map', f"{len(overlays) + 1}:a", '-c:a', 'aac', '-b:a', options["audio_bitrate"]]
+
+    command += ['-c:v', 'libx264', '-preset', options["preset"], '-threads', str(options["threads"])]
+    if options["bitrate"]:
+        command += ['-b:v', options["bitrate"]]
+    else:
+        command += ['-crf', str(options["crf"])]
+
+    if duration is not None:
+        command += ['-t', f"{duration:.3f}"]
+    else:
+        command += ['-shortest']
+    command += ['-r', str(fps), '-movflags', '+faststart', output_path]
+    return command
+
+
+def render_with_ffmpeg(output_path, size, **layout):
+    """
+    Render a layout with a single ffmpeg process (see ``build_ffmpeg_command`` for the arguments).
+
+    :return: ``output_path``
+    :raises RuntimeError: If ffmpeg fails, with its error output
+    """
+    command = build_ffmpeg_command(output_path, size, **layout)
+    logger.info(f"Rendering {output_path} with ffmpeg")
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed with exit code {result.returncode}: {result.stderr.strip()}")
+    return output_path
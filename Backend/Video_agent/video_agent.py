@@ -1,14 +1,91 @@
 # Backend/Video_agent/video_agent.py
 
 import os
+import time
+import logging
 import moviepy.editor as mpe
-from moviepy.video.tools.subtitles import SubtitlesClip
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeAudioClip, concatenate_videoclips, CompositeVideoClip
 from PIL import Image
+from .captions import CaptionRenderer, group_phrases, read_vtt_words, write_ass
+from .ffmpeg_render import DEFAULT_ENCODER_OPTIONS, probe_duration, render_title_card, render_with_ffmpeg
+try:
+    from ..TTS.manifest import load_manifest
+except ImportError:  # Video_agent imported as a top-level package (the workflows put Backend on sys.path)
+    from TTS.manifest import load_manifest
+
+logger = logging.getLogger(__name__)
+
+# x264 gains little from more threads than this on one 1080p encode, so a batch runs more
+# encodes side by side instead
+DEFAULT_THREADS_PER_JOB = 4
+
+
+def plan_batch_workers(job_count, max_workers=None, threads_per_job=None):
+    """
+    Split the cores of the machine between concurrent renders and the encoder threads of each.
+
+    :param job_count: Number of videos in the batch
+    :param max_workers: Maximum number of concurrent renders (default: as many as the cores allow)
+    :param threads_per_job: Encoder threads per render (default: the cores shared out between the renders)
+    :return: ``(workers, threads_per_job)``
+    """
+    cores = os.cpu_count() or 1
+    workers = max_workers or cores // (threads_per_job or DEFAULT_THREADS_PER_JOB)
+    workers = max(1, min(workers, job_count, cores))
+    return workers, threads_per_job or max(1, cores // workers)
+
+
+def _render_job(agent_options, job):
+    """Render one job of ``VideoAgent.render_batch`` (runs in a worker process)."""
+    report = {'id': job.get('id'), 'ok': False, 'output_path': None, 'seconds': 0.0, 'fps': 0.0, 'error': None}
+    started = time.perf_counter()
+    try:
+        agent = VideoAgent(**agent_options)
+        arguments = {key: value for key, value in job.items() if key != 'id'}
+        output_path = agent.create_tiktok_video(**arguments)
+        report['seconds'] = time.perf_counter() - started
+        if output_path is None:
+            raise RuntimeError("create_tiktok_video returned no video")
+        report.update(ok=True, output_path=output_path)
+    except Exception as e:
+        report['seconds'] = time.perf_counter() - started
+        report['error'] = f"{type(e).__name__}: {e}"
+        return report
+
+    # Frames encoded per second of wall time, from the length the timeline was planned with
+    try:
+        manifest = load_manifest(job['audio_path'])
+        duration = manifest['duration'] if manifest else probe_duration(job['audio_path'])
+    except Exception as e:
+        logger.warning(f"Could not measure the narration of {job['audio_path']}: {e}")
+        return report
+    if job.get('title_text'):
+        duration += job.get('title_duration', 3)
+    report['fps'] = duration * agent.fps / report['seconds']
+    return report
+
+
+def _failed_report(job, error):
+    return {'id': job.get('id'), 'ok': False, 'output_path': None, 'seconds': 0.0, 'fps': 0.0, 'error': error}
+
 
 class VideoAgent:
-    def __init__(self, output_dir="output_videos"):
+    def __init__(self, output_dir="output_videos", engine="moviepy", encoder_options=None, caption_style=None, karaoke=True):
+        """
+        :param output_dir: Directory the videos are saved in
+        :param engine: "moviepy" composites frames in Python; "ffmpeg" compiles the same layout into
+                       a single ffmpeg filter graph, which is much faster and uses little memory
+        :param encoder_options: Encoder settings (see DEFAULT_ENCODER_OPTIONS); the moviepy engine uses fps and threads
+        :param caption_style: Dictionary overriding entries of CAPTION_STYLE
+        :param karaoke: Highlight caption words as they are spoken
+        """
         self.output_dir = output_dir
+        self.engine = engine
+        self.encoder_options = encoder_options
+        self.caption_style = caption_style
+        self.karaoke = karaoke
         os.makedirs(self.output_dir, exist_ok=True)
 
     def create_tiktok_video(
@@ -20,11 +97,21 @@ class VideoAgent:
         title_text=None,  # Add title text parameter
         title_duration=3,  # Duration of the title screen in seconds
     ):
+        if self.engine == "ffmpeg":
+            return self.create_tiktok_video_ffmpeg(
+                screenshot_path, audio_path, vtt_path, output_filename, title_text, title_duration
+            )
+
         try:
             # Load assets
             screenshot = Image.open(screenshot_path)
-            audio = AudioFileClip(audio_path)
-            video_clip = self.image_to_video(screenshot, audio.duration)
+
+            # Plan the timeline from the narration manifest when the TTS step wrote one; the audio is
+            # only opened up front to measure it when there is none
+            manifest = load_manifest(audio_path)
+            audio = None if manifest else AudioFileClip(audio_path)
+            duration = manifest['duration'] if manifest else audio.duration
+            video_clip = self.image_to_video(screenshot, duration)
             
             # Create title clip if title text is provided
             if title_text:
@@ -33,17 +120,21 @@ class VideoAgent:
             else:
                 final_video = video_clip
 
+            audio = audio or AudioFileClip(audio_path)
             final_audio = mpe.CompositeAudioClip([audio])
             final_video = final_video.set_audio(final_audio)
             
-            # Add subtitles
-            if vtt_path and os.path.exists(vtt_path):
-                subtitles = SubtitlesClip(vtt_path, self.make_textclip)
-                final_video = CompositeVideoClip([final_video, subtitles.set_position(("center", "bottom"))])
+            # Add captions, rendered from a glyph atlas instead of a TextClip per cue
+            phrases = self.caption_phrases(manifest, vtt_path)
+            if phrases:
+                renderer = CaptionRenderer(final_video.w, self.caption_style, self.karaoke)
+                captions = renderer.make_clip(phrases, final_video.duration)
+                caption_y = final_video.h - renderer.style['bottom_margin'] - captions.h
+                final_video = CompositeVideoClip([final_video, captions.set_position(("center", max(caption_y, 0)))])
 
             # Save the video
             output_path = os.path.join(self.output_dir, output_filename)
-            final_video.write_videofile(output_path, codec="libx264", audio_codec="aac")
+            final_video.write_videofile(output_path, codec="libx264", audio_codec="aac", fps=self.fps, threads=self.threads)
             
             return output_path
 
@@ -51,6 +142,167 @@ class VideoAgent:
             print(f"Error creating TikTok video: {e}")
             return None
 
+    def create_tiktok_video_ffmpeg(
+        self,
+        screenshot_path,
+        audio_path,
+        vtt_path,
+        output_filename,
+        title_text=None,
+        title_duration=3,
+    ):
+        """
+        Renders the same layout as ``create_tiktok_video`` with a single ffmpeg invocation.
+
+        The screenshot fills the frame, a full-frame title card covers it for the first
+        ``title_duration`` seconds, the subtitles are burned in and the narration is muxed in.
+        """
+        title_card_path = None
+        captions_path = None
+        try:
+            with Image.open(screenshot_path) as screenshot:
+                width, height = screenshot.size
+            size = (width - width % 2, height - height % 2)  # x264 needs even dimensions
+
+            manifest = load_manifest(audio_path)
+            duration = manifest['duration'] if manifest else probe_duration(audio_path)
+
+            overlays = [{'path': screenshot_path, 'x': 0, 'y': 0}]
+            if title_text:
+                title_card_path = os.path.join(self.output_dir, f"{os.path.splitext(output_filename)[0]}_title.png")
+                render_title_card(title_text, size, title_card_path)
+                overlays.append({'path': title_card_path, 'x': 0, 'y': 0, 'start': 0, 'end': title_duration})
+                duration += title_duration
+
+            # Captions go in as a styled ASS track that libass burns in during the encode
+            phrases = self.caption_phrases(manifest, vtt_path)
+            if phrases:
+                captions_path = os.path.join(self.output_dir, f"{os.path.splitext(output_filename)[0]}_captions.ass")
+                write_ass(phrases, captions_path, size, self.caption_style, self.karaoke)
+
+            output_path = os.path.join(self.output_dir, output_filename)
+            render_with_ffmpeg(
+                output_path,
+                size,
+                duration=duration,
+                overlays=overlays,
+                audio_path=audio_path,
+                subtitles_path=captions_path,
+                encoder_options=self.encoder_options
+            )
+            return output_path
+
+        except Exception as e:
+            print(f"Error creating TikTok video: {e}")
+            return None
+        finally:
+            for temporary_path in (title_card_path, captions_path):
+                if temporary_path and os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+
+    @property
+    def threads(self):
+        """Encoder threads of one render (None lets the encoder decide)."""
+        return (self.encoder_options or {}).get('threads') or None
+
+    @property
+    def fps(self):
+        """Frame rate of the rendered videos."""
+        return (self.encoder_options or {}).get('fps') or DEFAULT_ENCODER_OPTIONS['fps']
+
+    def render_batch(self, jobs, max_workers=None, threads_per_job=None):
+        """
+        Renders a batch of videos in a process pool.
+
+        The cores are split between concurrent renders and the encoder threads of each (see
+        ``plan_batch_workers``), so a batch keeps the whole machine busy instead of leaving most
+        of it idle while one encode runs. A render that fails is reported; it doesn't stop the
+        rest of the batch. If a worker process dies, the renders it left unfinished are retried
+        on a fresh pool one at a time, and a render that kills a lone worker is reported as failed.
+
+        :param jobs: Dictionaries of ``create_tiktok_video`` arguments (``screenshot_path``,
+                     ``audio_path``, ``vtt_path``, ``output_filename`` and optionally ``title_text``
+                     and ``title_duration``), plus an optional ``id`` copied to the report
+        :param max_workers: Maximum number of concurrent renders
+        :param threads_per_job: Encoder threads per render
+        :return: List of per-job reports (dictionaries with ``id``, ``ok``, ``output_path``,
+                 ``seconds``, ``fps`` and ``error``), in job order
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        reports = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+        started = time.perf_counter()
+        while pending:
+            workers, threads = plan_batch_workers(len(pending), max_workers, threads_per_job)
+            logger.info(f"Rendering {len(pending)} videos with {workers} workers and {threads} encoder threads each")
+            broken = self._run_batch_pool(jobs, pending, reports, workers, threads)
+            if not broken:
+                break
+
+            if workers == 1:
+                # One worker runs the jobs in order, so the first unfinished job is the one that killed it
+                reports[broken[0]] = _failed_report(jobs[broken[0]], "BrokenProcessPool: the render worker died")
+                broken = broken[1:]
+            # A worker died (e.g. it ran out of memory), which breaks the whole pool. The unfinished
+            # renders go to a fresh pool, one at a time, so a render that crashes again is isolated
+            if broken:
+                logger.warning(f"A render worker died; retrying {len(broken)} unfinished renders one at a time")
+            pending = broken
+            max_workers = 1
+        elapsed = time.perf_counter() - started
+
+        succeeded = [report for report in reports if report['ok']]
+        logger.info(f"Rendered {len(succeeded)} of {len(reports)} videos in {elapsed:.1f}s")
+        for report in reports:
+            if report['ok']:
+                logger.info(f"Rendered {report['output_path']} in {report['seconds']:.1f}s ({report['fps']:.1f} fps)")
+            else:
+                logger.error(f"Render failed for {report['id']} after {report['seconds']:.1f}s: {report['error']}")
+        return reports
+
+    def _run_batch_pool(self, jobs, pending, reports, workers, threads):
+        """
+        Renders the pending jobs of a batch on one process pool, filling in their reports.
+
+        :return: Indexes of the jobs left unfinished because a worker died and broke the pool
+        """
+        agent_options = {
+            'output_dir': self.output_dir,
+            'engine': self.engine,
+            'encoder_options': {**(self.encoder_options or {}), 'threads': threads},
+            'caption_style': self.caption_style,
+            'karaoke': self.karaoke,
+        }
+        broken = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(index, executor.submit(_render_job, agent_options, jobs[index])) for index in pending]
+            for index, future in futures:
+                try:
+                    reports[index] = future.result()
+                except BrokenProcessPool:
+                    broken.append(index)
+                except Exception as e:
+                    reports[index] = _failed_report(jobs[index], f"{type(e).__name__}: {e}")
+        return broken
+
+    def caption_phrases(self, manifest, vtt_path):
+        """
+        Groups the narration's word timings into caption phrases.
+
+        Word timings come from the narration manifest, or from the VTT file when there is none.
+        Returns an empty list when neither is available.
+        """
+        if manifest and manifest['words']:
+            words = manifest['words']
+        elif vtt_path and os.path.exists(vtt_path):
+            words = read_vtt_words(vtt_path)
+        else:
+            return []
+        return group_phrases(words)
+
     def image_to_video(self, image, duration):
         """Converts a single image to a video clip of the specified duration."""
         return mpe.ImageClip(image).set_duration(duration)
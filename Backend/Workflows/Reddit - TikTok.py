@@ -10,8 +10,17 @@ import time
 from datetime import datetime
 import logging
 from data_ingestion.reddit import RedditClient
-from LLM.gemini import GeminiClient
+from data_ingestion.seen_index import SeenPostIndex
+from data_ingestion.post_card import render_post_cards
+from data_ingestion.screenshot_cache import ScreenshotCache
+from LLM.gemini import GeminiClient, prompt_registry
+from LLM.response_cache import ResponseCache
+from LLM.batching import generate_batched, DEFAULT_BATCH_TOKEN_BUDGET
+from LLM.selection import select_posts, DEFAULT_SHARD_TOKEN_BUDGET, DEFAULT_BODY_CHARS
+from LLM.prefilter import prefilter_posts, DEFAULT_PREFILTER_TOP_K
 from TTS.edge_tts import EdgeTTSClient  # Import Edge TTS
+from TTS.tts_cache import TTSCache
+from TTS.scheduler import TTSBatchScheduler
 from moviepy.editor import VideoFileClip, concatenate_videoclips, TextClip, CompositeVideoClip
 import asyncio  # Required for handling asynchronous TTS synthesis
 from Video_agent.video_agent import VideoAgent
@@ -23,42 +32,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-def fetch_reddit_posts(subreddit_name, limit=100):
-    reddit_client = RedditClient()
-    posts = reddit_client.fetch_top_posts(subreddit_name, limit=limit, time_filter='day', include_comments=True)
+# Reruns of a day's batch answer identical prompts from disk instead of calling Gemini again
+llm_cache = ResponseCache()
+
+# Sentences that were synthesized before (rerun posts, recurring intros/outros) are reused from disk
+tts_cache = TTSCache()
+
+def fetch_reddit_posts(subreddit_name, limit=100, max_workers=8, seen_index=None, as_records=True, reddit_client=None):
+    # Pass a RecordingRedditClient or ReplayRedditClient to record a run or replay it offline
+    reddit_client = reddit_client or RedditClient()
+    fetch_options = dict(
+        limit=limit, time_filter='day', include_comments=True,
+        max_workers=max_workers, seen_index=seen_index, as_records=as_records
+    )
+    # A list of subreddits is fetched concurrently and merged into one ranked candidate set
+    if isinstance(subreddit_name, (list, tuple)):
+        posts = reddit_client.fetch_many(subreddit_name, **fetch_options)
+        failed = [name for name, report in reddit_client.last_fetch_report.items() if report['error']]
+        if failed:
+            logger.warning(f"Failed to fetch subreddits: {failed}")
+    else:
+        posts = reddit_client.fetch_top_posts(subreddit_name, **fetch_options)
+    log_comment_fetch_times(reddit_client)
+    return posts
+
+def hydrate_posts(posts, reddit_client, max_workers=8):
+    # Records load their comments one post at a time on first access; load those of all posts in parallel
+    reddit_client.hydrate(posts, max_workers=max_workers)
+    log_comment_fetch_times(reddit_client)
     return posts
 
-def filter_posts_via_llm(posts, prompt_path=r'Backend\LLM\prompts\reddit_post_selection_for_tiktok.txt', limit=24):
-    gemini_client = GeminiClient()
-
-    with open(prompt_path, 'r') as file:
-        prompt_template = file.read().strip()
-
-    reddit_posts_info = "\n\n".join(
-        f"Post id: {post['id']}\n"
-        f"Title: {post['title']}\n"
-        f"Body: {post['body']}\n"
-        f"Score: {post['score']}\n"
-        f"Number of Comments: {post['num_comments']}\n"
-        f"Over 18: {post['over_18']}\n"
-        f"Upvote Ratio: {post['upvote_ratio']}\n"
-        f"Stickied: {post['is_stickied']}\n"
-        f"Media: {'None' if not post['media'] else 'Media present'}"
-        for post in posts
-        if not post['is_stickied'] and not post['media']
+def log_comment_fetch_times(reddit_client):
+    if reddit_client.last_fetch_times:
+        slowest_id = max(reddit_client.last_fetch_times, key=reddit_client.last_fetch_times.get)
+        logger.info(
+            f"Fetched comments for {len(reddit_client.last_fetch_times)} posts "
+            f"(slowest: {slowest_id} in {reddit_client.last_fetch_times[slowest_id]:.2f}s)"
+        )
+
+def filter_posts_via_llm(
+    posts,
+    prompt_path=r'Backend\LLM\prompts\reddit_post_selection_for_tiktok.txt',
+    limit=24,
+    gemini_client=None,
+    token_budget=DEFAULT_SHARD_TOKEN_BUDGET,
+    body_chars=DEFAULT_BODY_CHARS,
+    prefilter_top_k=DEFAULT_PREFILTER_TOP_K,
+    prefilter_weights=None,
+    prefilter_thresholds=None
+):
+    candidates = [post for post in posts if not post['is_stickied'] and not post['media']]
+
+    # Drop obvious losers with a heuristic score before they cost any prompt tokens
+    candidates = prefilter_posts(
+        candidates, top_k=prefilter_top_k, weights=prefilter_weights, thresholds=prefilter_thresholds
     )
+    if not candidates:
+        return []
 
-    final_prompt = f"{prompt_template}\n\nHere are the Reddit posts:\n\n{reddit_posts_info}"
-    
-    response = gemini_client.generate_content(final_prompt)
+    gemini_client = gemini_client or GeminiClient(cache=llm_cache)
 
-    selected_post_ids = [
-        line.strip() for line in response.split("\n")
-        if line.strip() and (line.startswith("Post id") or len(line.strip()) == 7)
-    ]
+    prompt_template = prompt_registry.get(prompt_path)
+
+    # Large candidate pools are split into token-budgeted shards and reduced in tournament rounds
+    selected_posts = asyncio.run(select_posts(
+        gemini_client, candidates, prompt_template, limit=limit, token_budget=token_budget, body_chars=body_chars
+    ))
 
-    selected_posts = [post for post in posts if post['id'] in selected_post_ids]
-    
     return selected_posts[:limit]
 
 def create_folder_structure_for_posts(posts):
@@ -78,84 +118,172 @@ def create_folder_structure_for_posts(posts):
         folder_paths[post_id] = post_folder
 
         json_file_path = os.path.join(post_folder, f'post_{post_id}.json')
+        # Load the comments of records so the saved post keeps its comments array
+        post_data = post.to_dict(include_comments=True) if hasattr(post, 'to_dict') else post
         with open(json_file_path, 'w') as json_file:
-            json.dump(post, json_file, indent=4)
+            json.dump(post_data, json_file, separators=(',', ':'))
         
         logger.info(f"Saved post data as JSON: {json_file_path}")
 
     return folder_paths
 
-def prepare_reddit_for_tts_via_llm(post, folder_path, prompt_path='Backend/LLM/prompts/prepare_raw_reddit_for_tts.txt'):
+def build_tts_input(post):
+    return {
+        "title": post['title'],
+        "body": post['body'],
+        "comments": [
+            {
+                "author": comment['author'],
+                "body": comment['body'],
+                "score": comment['score']
+            }
+            for comment in post.get('comments', [])
+        ]
+    }
+
+def build_tts_prompt(post, prompt_template):
+    return prompt_template.render(input_json=json.dumps(build_tts_input(post), indent=4))
+
+def save_tts_text(folder_path, tts_text):
+    tts_file_path = os.path.join(folder_path, 'formatted_for_tts.txt')
+
+    with open(tts_file_path, 'w', encoding='utf-8') as tts_file:
+        tts_file.write(tts_text)
+
+    logger.info(f"Formatted Reddit post for TTS saved at: {tts_file_path}")
+    return tts_file_path
+
+def prepare_reddit_for_tts_via_llm(post, folder_path, prompt_path='Backend/LLM/prompts/prepare_raw_reddit_for_tts.txt', gemini_client=None):
     try:
-        gemini_client = GeminiClient()
-        with open(prompt_path, 'r') as prompt_file:
-            prompt_template = prompt_file.read().strip()
-
-        reddit_post_info = {
-            "title": post['title'],
-            "body": post['body'],
-            "comments": [
-                {
-                    "author": comment['author'],
-                    "body": comment['body'],
-                    "score": comment['score']
-                }
-                for comment in post.get('comments', [])
-            ]
-        }
-
-        llm_prompt = prompt_template.replace("[INPUT_JSON]", json.dumps(reddit_post_info, indent=4))
-        llm_response = gemini_client.generate_content(llm_prompt)
+        gemini_client = gemini_client or GeminiClient(cache=llm_cache)
+        prompt_template = prompt_registry.get(prompt_path)
 
-        tts_file_path = os.path.join(folder_path, 'formatted_for_tts.txt')
+        llm_prompt = build_tts_prompt(post, prompt_template)
+        llm_response = gemini_client.generate_content(llm_prompt)
 
-        with open(tts_file_path, 'w', encoding='utf-8') as tts_file:
-            tts_file.write(llm_response)
+        if llm_response is None:
+            logger.error(f"No TTS text generated for post {post['id']}")
+            return None
 
-        logger.info(f"Formatted Reddit post for TTS saved at: {tts_file_path}")
+        return save_tts_text(folder_path, llm_response)
     except Exception as e:
         logger.error(f"Failed to prepare Reddit post for TTS: {e}")
-
-# Async function to generate TTS
-async def generate_narration_for_post(post, folder_path):
-    try:
-        tts_client = EdgeTTSClient()
+        return None
+
+# Prepare all posts for TTS concurrently, within the Gemini rate limit
+async def prepare_posts_for_tts_via_llm(
+    posts,
+    folder_paths,
+    gemini_client,
+    prompt_path='Backend/LLM/prompts/prepare_raw_reddit_for_tts.txt',
+    batch_prompt_path='Backend/LLM/prompts/prepare_raw_reddit_for_tts_batch.txt',
+    batched=True,
+    token_budget=DEFAULT_BATCH_TOKEN_BUDGET
+):
+    prompt_template = prompt_registry.get(prompt_path)
+
+    # Building the input may load a record's comments from Reddit, so do it in worker threads
+    tts_inputs = await asyncio.gather(*(asyncio.to_thread(build_tts_input, post) for post in posts))
+    tts_inputs = {post['id']: tts_input for post, tts_input in zip(posts, tts_inputs)}
+
+    def single_prompt(post_id):
+        return prompt_template.render(input_json=json.dumps(tts_inputs[post_id], indent=4))
+
+    if batched:
+        # Pack several posts per request; posts the batch response misses are retried one by one
+        batch_template = prompt_registry.get(batch_prompt_path).text
+        llm_responses = await generate_batched(gemini_client, tts_inputs, batch_template, single_prompt, token_budget)
+    else:
+        responses = await gemini_client.generate_many_async([single_prompt(post_id) for post_id in tts_inputs])
+        llm_responses = dict(zip(tts_inputs, responses))
+
+    tts_file_paths = {}
+    for post_id, llm_response in llm_responses.items():
+        if llm_response is None:
+            logger.error(f"No TTS text generated for post {post_id}")
+            continue
+        tts_file_paths[post_id] = save_tts_text(folder_paths[post_id], llm_response)
+
+    return tts_file_paths
+
+# Function to handle TTS generation for all posts, at a bounded rate with retries
+async def generate_narrations_for_posts(posts, folder_paths, scheduler=None):
+    scheduler = scheduler or TTSBatchScheduler(cache=tts_cache)
+
+    jobs = []
+    for post in posts:
+        post_id = post['id']
+        folder_path = folder_paths[post_id]
         tts_text_file = os.path.join(folder_path, 'formatted_for_tts.txt')
 
+        if not os.path.exists(tts_text_file):
+            logger.error(f"No TTS text to narrate for post {post_id}")
+            continue
         with open(tts_text_file, 'r', encoding='utf-8') as f:
-            post_text = f.read()
+            jobs.append((post_id, f.read(), folder_path))
+
+    reports = await scheduler.run(jobs)
+    for report in reports:
+        if report['ok']:
+            logger.info(
+                f"Narration and captions saved for post {report['post_id']} "
+                f"({report['audio_seconds']:.0f}s of audio in {report['seconds']:.1f}s)"
+            )
+    log_tts_cache_stats()
+    return reports
+
+def log_tts_cache_stats():
+    stats = tts_cache.stats()
+    logger.info(
+        f"TTS cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate, {stats['saved_audio_seconds']:.0f}s of audio reused)"
+    )
+
+# Stream each post's TTS text from Gemini straight into TTS, sentence by sentence (Steps 4 and 5 in one)
+async def stream_narration_for_post(post, folder_path, gemini_client, prompt_template):
+    try:
+        tts_input = await asyncio.to_thread(build_tts_input, post)
+        llm_prompt = prompt_template.render(input_json=json.dumps(tts_input, indent=4))
 
-        audio_path, vtt_path = await tts_client.synthesize_post(post_text, folder_path)
+        tts_client = EdgeTTSClient(cache=tts_cache, request_timeout=120, max_retries=3)
+        audio_path, vtt_path = await tts_client.synthesize_stream(
+            gemini_client.generate_content_stream_async(llm_prompt), folder_path
+        )
 
         if audio_path and vtt_path:
-            logger.info(f"Narration and captions saved for post {post['id']} at {folder_path}")
+            logger.info(f"Narration and captions streamed for post {post['id']} at {folder_path}")
         else:
-            logger.error(f"Failed to generate narration for post {post['id']}")
-    
-    except Exception as e:
-        logger.error(f"Error while generating narration for post {post['id']}: {e}")
+            logger.error(f"Failed to stream narration for post {post['id']}")
 
-# Function to handle TTS generation for all posts
-async def generate_narrations_for_posts(posts, folder_paths):
-    tasks = []
-    for post in posts:
-        post_id = post['id']
-        folder_path = folder_paths[post_id]
-        task = generate_narration_for_post(post, folder_path)
-        tasks.append(task)
+    except Exception as e:
+        logger.error(f"Error while streaming narration for post {post['id']}: {e}")
 
-    await asyncio.gather(*tasks)
+async def stream_narrations_for_posts(posts, folder_paths, gemini_client, prompt_path='Backend/LLM/prompts/prepare_raw_reddit_for_tts.txt'):
+    prompt_template = prompt_registry.get(prompt_path)
+    await asyncio.gather(
+        *(stream_narration_for_post(post, folder_paths[post['id']], gemini_client, prompt_template) for post in posts)
+    )
+    log_tts_cache_stats()
 
-def create_screenshots_for_selected_posts(posts, folder_paths):
-    reddit_client = RedditClient()
+def create_screenshots_for_selected_posts(posts, folder_paths, pool_size=3, renderer='browser', screenshot_cache=None):
     screenshot_paths = []
 
+    if renderer == 'native':
+        # Draw the post cards with PIL instead of loading each post in Chrome
+        captured = render_post_cards(posts, folder_paths)
+    else:
+        # Capture concurrently over a pool of reused browsers, reusing unchanged screenshots
+        captured = RedditClient().screenshot_posts(posts, folder_paths, pool_size=pool_size, cache=screenshot_cache)
+        if screenshot_cache is not None:
+            stats = screenshot_cache.stats()
+            logger.info(
+                f"Screenshot cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate, ~{stats['saved_seconds']:.0f}s of browser time saved)"
+            )
+
     for post in posts:
         post_id = post['id']
-        subreddit_name = post['subreddit']
-        post_folder = folder_paths.get(post_id)
-
-        screenshot_path = reddit_client.screenshot_post_preview(subreddit_name, post_id, output_dir=post_folder)
+        screenshot_path = captured.get(post_id)
 
         if screenshot_path:
             logger.info(f"Screenshot saved for post {post_id} at {screenshot_path}")
@@ -166,59 +294,81 @@ def create_screenshots_for_selected_posts(posts, folder_paths):
     return screenshot_paths
 
 if __name__ == "__main__":
+    seen_index = SeenPostIndex()  # Remembers posts handled by earlier runs
+    reddit_client = RedditClient()  # Pass a RecordingRedditClient or ReplayRedditClient to record or replay a run
+    screenshot_cache = ScreenshotCache()  # Reuses screenshots of posts that haven't changed
+    gemini_client = GeminiClient(cache=llm_cache)  # Shared by all LLM steps so they share one rate limit
+    stream_narration = False  # Overlap TTS text generation with speech synthesis
+    tts_scheduler = TTSBatchScheduler(backend="edge", cache=tts_cache)  # backend="local" narrates offline with espeak-ng
+
     while True:
         logger.info("Starting Reddit to TikTok Workflow...")
 
-        # Step 1: Fetch Reddit posts (max 100)
-        posts = fetch_reddit_posts(subreddit_name='AskReddit', limit=100)
+        # Step 1: Fetch new or changed Reddit posts (max 100)
+        posts = fetch_reddit_posts(subreddit_name='AskReddit', limit=100, seen_index=seen_index, reddit_client=reddit_client)
         logger.info(f"Fetched {len(posts)} posts from subreddit: LifeProTips")
 
         # Step 2: Filter posts via LLM using the specified prompt template
         logger.info("Building Reddit post info for LLM prompt...")
-        selected_posts = filter_posts_via_llm(posts)
+        selected_posts = filter_posts_via_llm(posts, gemini_client=gemini_client)
+        # Posts the selection passed over are handled now (unless it failed and selected nothing);
+        # selected posts only count as handled once their video is rendered
+        if selected_posts:
+            selected_ids = {post['id'] for post in selected_posts}
+            seen_index.mark_seen([post for post in posts if post['id'] not in selected_ids])
+        # Posts whose video was already rendered are handled as well, so they don't come back as changed
+        unrendered_posts = seen_index.filter_unrendered(selected_posts)
+        unrendered_ids = {post['id'] for post in unrendered_posts}
+        seen_index.mark_seen([post for post in selected_posts if post['id'] not in unrendered_ids])
+        selected_posts = unrendered_posts
+        hydrate_posts(selected_posts, reddit_client)
         logger.info(f"Selected posts: {selected_posts}")
 
         # Step 3: Create folder structure for the selected posts
         folder_paths = create_folder_structure_for_posts(selected_posts)
 
-        # Step 4: Prepare each post and its comments for TTS and save it in the corresponding folder
-        logger.info("Preparing posts for TTS...")
-        for post in selected_posts:
-            post_id = post['id']
-            folder_path = folder_paths[post_id]
-            prepare_reddit_for_tts_via_llm(post, folder_path)
-        
-        # Step 5: Generate narrations for the selected posts using TTS
-        logger.info("Generating narrations for selected posts...")
-        asyncio.run(generate_narrations_for_posts(selected_posts, folder_paths))
+        if stream_narration:
+            # Steps 4 and 5: Stream the TTS text of each post into TTS while it is being generated
+            logger.info("Streaming TTS text into narrations for selected posts...")
+            asyncio.run(stream_narrations_for_posts(selected_posts, folder_paths, gemini_client))
+        else:
+            # Step 4: Prepare each post and its comments for TTS and save it in the corresponding folder
+            logger.info("Preparing posts for TTS...")
+            asyncio.run(prepare_posts_for_tts_via_llm(selected_posts, folder_paths, gemini_client))
+
+            # Step 5: Generate narrations for the selected posts using TTS
+            logger.info("Generating narrations for selected posts...")
+            asyncio.run(generate_narrations_for_posts(selected_posts, folder_paths, tts_scheduler))
 
         # Step 6: Create screenshots for the selected posts
         logger.info("Creating screenshots for selected posts...")
-        screenshot_paths = create_screenshots_for_selected_posts(selected_posts, folder_paths)
+        screenshot_paths = create_screenshots_for_selected_posts(selected_posts, folder_paths, screenshot_cache=screenshot_cache)
         logger.info(f"Screenshots saved: {screenshot_paths}")
 
         # Step 7: Create TikTok videos using the VideoAgent
         video_agent = VideoAgent(output_dir="tiktok_videos")  # Create an instance of VideoAgent
+        posts_by_id = {post['id']: post for post in selected_posts}
+        render_jobs = []
         for post in selected_posts:
             post_id = post['id']
             folder_path = folder_paths[post_id]
-            screenshot_path = os.path.join(folder_path, f"post_{post_id}.png")
-            audio_path = os.path.join(folder_path, 'narration.mp3')
-            vtt_path = os.path.join(folder_path, 'narration.vtt')
-            output_filename = f"tiktok_{post_id}.mp4"
-
-            # Pass the title of the Reddit post to the video creation function
-            video_path = video_agent.create_tiktok_video(
-                screenshot_path, 
-                audio_path, 
-                vtt_path, 
-                output_filename,
-                title_text=post['title']  # Pass the post title here
-            )
-            if video_path:
-                logger.info(f"TikTok video created at: {video_path}")
+            render_jobs.append({
+                'id': post_id,
+                'screenshot_path': os.path.join(folder_path, f"post_{post_id}.png"),
+                'audio_path': os.path.join(folder_path, 'narration.mp3'),
+                'vtt_path': os.path.join(folder_path, 'narration.vtt'),
+                'output_filename': f"tiktok_{post_id}.mp4",
+                'title_text': post['title']  # Pass the title of the Reddit post to the video
+            })
+
+        # Render the day's videos in parallel; a failed render doesn't stop the others
+        for report in video_agent.render_batch(render_jobs):
+            if report['ok']:
+                logger.info(f"TikTok video created at: {report['output_path']}")
+                seen_index.mark_seen([posts_by_id[report['id']]])
+                seen_index.mark_rendered(report['id'])
             else:
-                logger.error(f"Failed to create TikTok video for post {post_id}")
+                logger.error(f"Failed to create TikTok video for post {report['id']}")
 
         # Step 7: Wait before the next run
         logger.info("Workflow completed. Waiting for next run.")
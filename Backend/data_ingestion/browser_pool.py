@@ -0,0 +1,129 @@
+import queue
+import shutil
+import threading
+import logging
+from contextlib import contextmanager
+import undetected_chromedriver as uc
+
+logger = logging.getLogger(__name__)
+
+# undetected_chromedriver patches the driver binary on start-up, which is not safe to run concurrently
+_driver_creation_lock = threading.Lock()
+
+
+def create_chrome_driver(chrome_profile_path=None, page_load_timeout=None):
+    """
+    Start an undetected ChromeDriver session with the options used for Reddit screenshots.
+
+    :param chrome_profile_path: Path to the Chrome user profile to maintain the login session
+    :param page_load_timeout: Seconds after which a page load is aborted (default None keeps Chrome's default)
+    :return: The ChromeDriver instance
+    """
+    options = uc.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    # Use a user profile if provided
+    if chrome_profile_path:
+        options.add_argument(f"user-data-dir={chrome_profile_path}")  # Path to Chrome user profile
+
+    with _driver_creation_lock:
+        driver = uc.Chrome(options=options)
+    if page_load_timeout:
+        driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+def quit_driver(driver):
+    """Close a ChromeDriver session, logging instead of raising if it is already gone."""
+    try:
+        driver.quit()
+    except OSError as os_error:
+        print(f"OSError while quitting driver: {os_error}")
+    except Exception as e:
+        print(f"Exception while quitting driver: {e}")
+
+
+class ChromeDriverPool:
+    """
+    A fixed-size pool of long-lived ChromeDriver sessions shared across screenshots.
+
+    Drivers are started on first use and reused until the pool is closed, so a batch of posts
+    pays for Chrome's start-up only once per driver. A driver that fails is replaced by a
+    fresh one the next time it is handed out.
+    """
+
+    def __init__(self, size=3, chrome_profile_path=None, page_load_timeout=30):
+        """
+        :param size: Number of Chrome sessions in the pool
+        :param chrome_profile_path: Path to the Chrome user profile to maintain the login session.
+                                    Chrome locks a profile to one process, so with more than one
+                                    driver each gets its own copy at ``<path>_<index>``, refreshed
+                                    from the profile whenever the driver is started.
+        :param page_load_timeout: Seconds after which a page load is aborted
+        """
+        if size < 1:
+            raise ValueError("ChromeDriverPool size must be at least 1")
+
+        self.size = size
+        self.chrome_profile_path = chrome_profile_path
+        self.page_load_timeout = page_load_timeout
+        self._slots = queue.Queue()
+        for index in range(size):
+            self._slots.put([index, None])  # Driver slots, filled lazily
+        self._closed = False
+
+    def _profile_path(self, index):
+        """Profile directory of a driver slot, copying the profile into it when the pool has several drivers."""
+        if not self.chrome_profile_path or self.size == 1:
+            return self.chrome_profile_path
+        profile_copy = f"{self.chrome_profile_path}_{index}"
+        # Lock files of a running Chrome would make the copy look in use
+        shutil.copytree(
+            self.chrome_profile_path, profile_copy, dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns('Singleton*', 'lockfile')
+        )
+        return profile_copy
+
+    @contextmanager
+    def driver(self):
+        """
+        Borrow a driver from the pool for the duration of a ``with`` block.
+
+        If the block raises, the driver is assumed broken and is quit so the slot starts a new
+        one next time.
+        """
+        if self._closed:
+            raise RuntimeError("ChromeDriverPool is closed")
+
+        slot = self._slots.get()
+        try:
+            if slot[1] is None:
+                logger.info(f"Starting Chrome driver {slot[0] + 1}/{self.size}")
+                slot[1] = create_chrome_driver(self._profile_path(slot[0]), self.page_load_timeout)
+            try:
+                yield slot[1]
+            except Exception:
+                quit_driver(slot[1])
+                slot[1] = None
+                raise
+        finally:
+            self._slots.put(slot)
+
+    def close(self):
+        """Quit all drivers in the pool. Closing a closed pool does nothing."""
+        if self._closed:
+            return
+        self._closed = True
+        slots = [self._slots.get() for _ in range(self.size)]
+        for slot in slots:
+            if slot[1] is not None:
+                quit_driver(slot[1])
+                slot[1] = None
+            self._slots.put(slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,215 @@
+import os
+import logging
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+# Fonts tried in order; the first one found is used (Windows first, then common Linux/macOS fonts)
+FONT_CANDIDATES = {
+    False: ['arial.ttf', 'C:\\Windows\\Fonts\\arial.ttf', 'DejaVuSans.ttf',
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/Library/Fonts/Arial.ttf'],
+    True: ['arialbd.ttf', 'C:\\Windows\\Fonts\\arialbd.ttf', 'DejaVuSans-Bold.ttf',
+           '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', '/Library/Fonts/Arial Bold.ttf'],
+}
+
+# Card styling, roughly matching Reddit's light theme
+CARD_STYLE = {
+    'width': 1000,
+    'padding': 40,
+    'corner_radius': 24,
+    'background': (255, 255, 255),
+    'header_color': (124, 124, 124),
+    'title_color': (26, 26, 27),
+    'body_color': (54, 54, 54),
+    'footer_color': (135, 138, 140),
+    'header_size': 26,
+    'title_size': 44,
+    'body_size': 30,
+    'footer_size': 26,
+    'line_spacing': 1.3,
+    'max_title_lines': 5,
+    'max_body_lines': 12,
+}
+
+
+@lru_cache(maxsize=None)
+def load_font(size, bold=False):
+    """Load (once per size and weight) the first available card font, falling back to Pillow's default."""
+    for candidate in FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    logger.warning("No TrueType font found for post cards, using Pillow's default font")
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow before 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=65536)
+def _text_width(text, size, bold):
+    """Cached width in pixels of a piece of text, so repeated words are measured only once."""
+    return load_font(size, bold).getlength(text)
+
+
+def _break_word(word, size, bold, max_width):
+    """Split a word wider than ``max_width`` pixels (e.g. a long URL) into pieces that fit, by character."""
+    if _text_width(word, size, bold) <= max_width:
+        return [word]
+    font = load_font(size, bold)  # Prefixes are measured directly so they don't crowd the width cache
+    pieces, piece = [], ''
+    for char in word:
+        if piece and font.getlength(piece + char) > max_width:
+            pieces.append(piece)
+            piece = ''
+        piece += char
+    pieces.append(piece)
+    return pieces
+
+
+def wrap_text(text, size, bold, max_width, max_lines):
+    """
+    Greedily wrap text to lines that fit in ``max_width`` pixels.
+
+    Words wider than a whole line are broken by character.
+
+    :return: List of lines; the last one ends with an ellipsis if the text was cut off
+    """
+    lines = []
+    space = _text_width(' ', size, bold)
+    for paragraph in text.splitlines():
+        words = [piece for word in paragraph.split() for piece in _break_word(word, size, bold, max_width)]
+        if not words:
+            if lines and lines[-1]:
+                lines.append('')  # Keep paragraph breaks, but never two blank lines in a row
+            continue
+
+        line, line_width = [], 0.0
+        for word in words:
+            word_width = _text_width(word, size, bold)
+            if line and line_width + space + word_width > max_width:
+                lines.append(' '.join(line))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0) + word_width
+            line.append(word)
+        lines.append(' '.join(line))
+
+        if len(lines) > max_lines:
+            break
+
+    while lines and not lines[-1]:
+        lines.pop()
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        last = lines[-1]
+        while last and _text_width(last + '...', size, bold) > max_width:
+            last = last[:-1]
+        lines[-1] = last.rstrip() + '...'
+    return lines
+
+
+def render_post_card(post, output_dir, style=None):
+    """
+    Draw a post card (subreddit, author, title, body excerpt, score) straight from the post data.
+
+    The image is saved as ``post_<id>.png`` in ``output_dir``, the same file name the browser
+    screenshot uses, so it can be passed to the video stage unchanged.
+
+    :param post: Post dictionary (or PostRecord) as returned by ``RedditClient``
+    :param output_dir: Directory to save the card in
+    :param style: Optional dictionary overriding entries of ``CARD_STYLE``
+    :return: Path to the saved card image, or None if rendering failed
+    """
+    style = {**CARD_STYLE, **(style or {})}
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        padding = style['padding']
+        content_width = style['width'] - 2 * padding
+
+        header = f"r/{post['subreddit']}  \u2022  u/{post['author']}"
+        title_lines = wrap_text(post['title'], style['title_size'], True, content_width, style['max_title_lines'])
+        body = post.get('body') or ''
+        body_lines = [] if body == 'N/A' else wrap_text(
+            body, style['body_size'], False, content_width, style['max_body_lines']
+        )
+        footer = f"\u25b2 {post['score']:,}    {post.get('num_comments', 0):,} comments"
+
+        def line_height(size):
+            return int(size * style['line_spacing'])
+
+        height = (
+            padding
+            + line_height(style['header_size'])
+            + len(title_lines) * line_height(style['title_size'])
+            + (padding // 2 + len(body_lines) * line_height(style['body_size']) if body_lines else 0)
+            + padding // 2 + line_height(style['footer_size'])
+            + padding
+        )
+
+        image = Image.new('RGBA', (style['width'], height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        draw.rounded_rectangle(
+            (0, 0, style['width'] - 1, height - 1), radius=style['corner_radius'], fill=style['background']
+        )
+
+        y = padding
+        draw.text((padding, y), header, font=load_font(style['header_size']), fill=style['header_color'])
+        y += line_height(style['header_size'])
+
+        title_font = load_font(style['title_size'], True)
+        for line in title_lines:
+            draw.text((padding, y), line, font=title_font, fill=style['title_color'])
+            y += line_height(style['title_size'])
+
+        if body_lines:
+            y += padding // 2
+            body_font = load_font(style['body_size'])
+            for line in body_lines:
+                draw.text((padding, y), line, font=body_font, fill=style['body_color'])
+                y += line_height(style['body_size'])
+
+        y += padding // 2
+        draw.text((padding, y), footer, font=load_font(style['footer_size'], True), fill=style['footer_color'])
+
+        card_path = os.path.join(output_dir, f"post_{post['id']}.png")
+        image.save(card_path)
+        return card_path
+
+    except Exception as e:
+        logger.error(f"Error rendering post card for post {post.get('id')}: {e}")
+        return None
+
+
+def _render_post_card_job(job):
+    post, output_dir, style = job
+    return post['id'], render_post_card(post, output_dir, style)
+
+
+def render_post_cards(posts, output_dirs, processes=None, style=None):
+    """
+    Render post cards for many posts, spread over a process pool.
+
+    :param posts: Post dictionaries (or PostRecords)
+    :param output_dirs: Dictionary mapping post id to the directory its card is saved in
+    :param processes: Number of worker processes (default None uses one per core; 1 renders in-process)
+    :param style: Optional dictionary overriding entries of ``CARD_STYLE``
+    :return: Dictionary mapping post id to the card path (None if rendering failed)
+    """
+    # Only plain post data is sent to the workers; records may hold unpicklable comment loaders
+    jobs = [
+        (
+            post.to_dict(include_comments=False) if hasattr(post, 'to_dict')
+            else {key: value for key, value in post.items() if key != 'comments'},
+            output_dirs[post['id']],
+            style
+        )
+        for post in posts
+    ]
+    if processes == 1 or len(jobs) <= 1:
+        return dict(map(_render_post_card_job, jobs))
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return dict(executor.map(_render_post_card_job, jobs))
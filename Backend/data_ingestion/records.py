@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field, fields
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RecordMixin:
+    """Dictionary-style read access, so records can be used wherever post dictionaries are expected."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._keys()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _keys(self):
+        return type(self)._KEYS
+
+
+@dataclass(slots=True)
+class CommentRecord(RecordMixin):
+    """A single Reddit comment, with the same keys as the comment dictionaries of ``RedditClient``."""
+
+    comment_id: str
+    author: str
+    body: str
+    score: int
+    created: str
+    gilded: int = 0
+    is_submitter: bool = False
+    parent_id: str = None
+    link_id: str = None
+
+    def to_dict(self):
+        return {
+            'author': self.author,
+            'body': self.body,
+            'score': self.score,
+            'created': self.created,
+            'gilded': self.gilded,
+            'is_submitter': self.is_submitter,
+            'parent_id': self.parent_id,
+            'link_id': self.link_id,
+            'comment_id': self.comment_id
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: data[key] for key in cls._KEYS if key in data})
+
+
+@dataclass(slots=True)
+class PostRecord(RecordMixin):
+    """
+    A Reddit post, with the same keys as the post dictionaries of ``RedditClient``.
+
+    Comments are not part of the record until they are needed: ``comment_loader`` is called the
+    first time ``comments`` is read and the result is kept for later reads.
+    """
+
+    id: str
+    title: str
+    author: str
+    score: int
+    url: str
+    num_comments: int
+    created: str
+    body: str
+    subreddit: str
+    upvote_ratio: float
+    is_stickied: bool = False
+    gilded: int = 0
+    over_18: bool = False
+    flair: str = 'N/A'
+    media: object = None
+    edited: float = None
+    _comments: list = field(default=None, repr=False)
+    _comment_loader: object = field(default=None, repr=False, compare=False)
+
+    @property
+    def comments(self):
+        """Comments of the post, loaded on first access."""
+        if self._comments is None:
+            if self._comment_loader is None:
+                return []
+            try:
+                self._comments = self._comment_loader()
+            except Exception as e:
+                logger.error(f"Error loading comments for post {self.id}: {e}")
+                return []
+            self._comment_loader = None  # Drop the loader so it can be garbage collected
+        return self._comments
+
+    @property
+    def comments_loaded(self):
+        """Whether the comments have been loaded (or were given up front)."""
+        return self._comments is not None
+
+    def _keys(self):
+        if self._comments is not None or self._comment_loader is not None:
+            return PostRecord._KEYS_WITH_COMMENTS
+        return PostRecord._KEYS
+
+    def to_dict(self, include_comments=None):
+        """
+        Convert the record to the post dictionary format.
+
+        :param include_comments: True to load and include comments, False to leave them out,
+                                 None (default) to include them only if they are already loaded
+        :return: Post dictionary
+        """
+        data = {
+            'title': self.title,
+            'author': self.author,
+            'score': self.score,
+            'id': self.id,
+            'url': self.url,
+            'num_comments': self.num_comments,
+            'created': self.created,
+            'body': self.body,
+            'is_stickied': self.is_stickied,
+            'gilded': self.gilded,
+            'over_18': self.over_18,
+            'subreddit': self.subreddit,
+            'upvote_ratio': self.upvote_ratio,
+            'flair': self.flair,
+            'media': self.media,
+            'edited': self.edited
+        }
+        if include_comments or (include_comments is None and self.comments_loaded):
+            data['comments'] = [comment.to_dict() for comment in self.comments]
+        return data
+
+    @classmethod
+    def from_dict(cls, data, comment_loader=None):
+        """
+        Build a record from a post dictionary.
+
+        :param data: Post dictionary, optionally with a ``comments`` list
+        :param comment_loader: Callable returning the comments, used when ``data`` has none
+        """
+        record = cls(**{key: data[key] for key in cls._KEYS if key in data})
+        if 'comments' in data:
+            record._comments = [CommentRecord.from_dict(comment) for comment in data['comments']]
+        else:
+            record._comment_loader = comment_loader
+        return record
+
+
+def _public_field_names(cls):
+    return frozenset(f.name for f in fields(cls) if not f.name.startswith('_'))
+
+
+CommentRecord._KEYS = _public_field_names(CommentRecord)
+PostRecord._KEYS = _public_field_names(PostRecord)
+PostRecord._KEYS_WITH_COMMENTS = PostRecord._KEYS | {'comments'}
@@ -1,30 +1,71 @@
 import praw
 from .config import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
+from .records import PostRecord, CommentRecord
+from .browser_pool import ChromeDriverPool, create_chrome_driver, quit_driver
 from prawcore.exceptions import NotFound, RequestException
 import time
-import undetected_chromedriver as uc
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 import os
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from PIL import Image
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Leave a few requests of headroom in the rate-limit window for the listing calls
+RATE_LIMIT_MIN_REMAINING = 10
+
+# Seconds to wait for a post element to appear before giving up on its screenshot
+SCREENSHOT_WAIT_TIMEOUT = 15
+
+# Upper bound on the number of subreddit listings requested at the same time by fetch_many
+FAN_OUT_MAX_WORKERS = 16
+
 class RedditClient:
     def __init__(self):
+        self.last_fetch_times = {}  # Seconds spent fetching comments, keyed by post id
+        self.last_fetch_report = {}  # Latency, post count and error per subreddit of the last fetch_many call
+        self._rate_limit_lock = threading.Lock()
+        self._thread_local = threading.local()
         try:
-            self.reddit = praw.Reddit(
-                client_id=REDDIT_CLIENT_ID,
-                client_secret=REDDIT_CLIENT_SECRET,
-                user_agent=REDDIT_USER_AGENT
-            )
+            self.reddit = self._create_reddit()
         except Exception as e:
             print(f"Error initializing Reddit client: {e}")
             raise
 
+    @staticmethod
+    def _create_reddit():
+        return praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT
+        )
+
+    def _worker_reddit(self):
+        """
+        The PRAW instance of the calling thread.
+
+        PRAW instances are not thread-safe, so every worker thread that fetches comments gets its
+        own (created on first use); the main thread keeps using ``self.reddit``.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+        reddit = getattr(self._thread_local, 'reddit', None)
+        if reddit is None:
+            reddit = self._thread_local.reddit = self._create_reddit()
+        return reddit
+
     def convert_timestamp(self, ts):
         """Convert UNIX timestamp to a human-readable format."""
         return datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
 
-    def fetch_top_posts(self, subreddit_name, limit=5, time_filter='day', include_comments=False, comments_limit=100):
+    def fetch_top_posts(self, subreddit_name, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=None, seen_index=None, as_records=False):
         """
         Fetch top posts and optionally comments from a specific subreddit.
         
@@ -33,15 +74,18 @@ class RedditClient:
         :param time_filter: Time filter for top posts ('day', 'week', 'month', 'year', 'all')
         :param include_comments: Boolean, whether to fetch comments for each post
         :param comments_limit: Number of top comments to fetch (if include_comments is True)
-        :return: List of dictionaries containing post details (and optionally comments)
+        :param max_workers: Number of comment trees to fetch in parallel (default None fetches them one post at a time)
+        :param seen_index: Optional SeenPostIndex; when given, only new or materially changed posts are returned
+        :param as_records: Return compact PostRecord objects whose comments are fetched on first access
+                           (max_workers is then not used; load the comments of many records at once
+                           with ``hydrate``)
+        :return: List of dictionaries (or PostRecords) containing post details (and optionally comments)
         """
-        valid_time_filters = ['day', 'week', 'month', 'year', 'all']
-        if time_filter not in valid_time_filters:
-            raise ValueError(f"Invalid time_filter value. Allowed values: {valid_time_filters}")
+        self._validate_time_filter(time_filter)
+        self.last_fetch_times = {}
 
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            top_posts = subreddit.top(time_filter=time_filter, limit=limit)
+            top_posts = self._fetch_listing(subreddit_name, limit, time_filter)
         except NotFound:
             print(f"Subreddit '{subreddit_name}' not found.")
             return []
@@ -52,51 +96,317 @@ class RedditClient:
             print(f"An unexpected error occurred: {e}")
             return []
 
-        posts_data = []
-        for post in top_posts:
-            post_data = {
-                'title': post.title,
-                'author': post.author.name if post.author else '[deleted]',
-                'score': post.score,
-                'id': post.id,
-                'url': post.url,
-                'num_comments': post.num_comments,
-                'created': self.convert_timestamp(post.created_utc),
-                'body': post.selftext if post.selftext else 'N/A',
-                'is_stickied': post.stickied,
-                'gilded': post.gilded,
-                'over_18': post.over_18,
-                'subreddit': post.subreddit.display_name,
-                'upvote_ratio': post.upvote_ratio,
-                'flair': post.link_flair_text if post.link_flair_text else 'N/A',
-                'media': post.media['o'] if post.media and 'o' in post.media else None
+        return self._process_posts(
+            top_posts, include_comments, comments_limit, max_workers, seen_index, as_records,
+            source=f"r/{subreddit_name}"
+        )
+
+    def iter_top_posts(self, subreddit_name, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=8, seen_index=None, as_records=False):
+        """
+        Stream top posts of a subreddit, yielding each one as soon as it is fully hydrated.
+
+        Unlike ``fetch_top_posts``, nothing waits for the slowest comment tree: posts are yielded
+        in the order their comments finish loading, so downstream stages can start on the first
+        posts while later ones are still downloading. The parameters behave as in
+        ``fetch_top_posts``; with ``as_records`` the yielded records already hold their comments.
+
+        :return: Generator of dictionaries (or PostRecords); empty if the listing can't be fetched
+        """
+        self._validate_time_filter(time_filter)
+        self.last_fetch_times = {}
+
+        try:
+            top_posts = self._fetch_listing(subreddit_name, limit, time_filter)
+        except NotFound:
+            print(f"Subreddit '{subreddit_name}' not found.")
+            return
+        except RequestException as e:
+            print(f"Network error occurred: {e}")
+            return
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+            return
+
+        posts_data = [self._build_post_data(post) for post in top_posts]
+        posts_data, _ = self._filter_seen(posts_data, top_posts, seen_index, f"r/{subreddit_name}")
+
+        if include_comments:
+            posts = self._iter_hydrated(posts_data, comments_limit, max(1, max_workers or 1))
+        else:
+            posts = iter(posts_data)
+
+        for post_data in posts:
+            yield PostRecord.from_dict(post_data) if as_records else post_data
+
+    def fetch_many(self, subreddits, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=None, seen_index=None, as_records=False, total_limit=None):
+        """
+        Fetch top posts from many subreddits concurrently and merge them into one ranked list.
+
+        All listings are requested in parallel over this client's authenticated session, so the
+        whole fan-out takes roughly as long as the slowest subreddit. Posts are ranked by their
+        score relative to the top post of their own subreddit, which keeps small subreddits from
+        being drowned out by large ones. Per-subreddit latency, post count and error are stored
+        in ``last_fetch_report``. The remaining parameters behave as in ``fetch_top_posts``.
+
+        :param subreddits: Iterable of subreddit names
+        :param limit: Number of posts to fetch per subreddit
+        :param total_limit: Maximum number of posts in the merged result (default None keeps all)
+        :return: Ranked list of dictionaries (or PostRecords) from all subreddits
+        """
+        self._validate_time_filter(time_filter)
+        subreddits = list(dict.fromkeys(subreddits))  # Drop duplicates, keep order
+        self.last_fetch_report = {}
+        self.last_fetch_times = {}
+        if not subreddits:
+            return []
+
+        def fetch_listing(subreddit_name):
+            start = time.perf_counter()
+            try:
+                return self._fetch_listing(subreddit_name, limit, time_filter), None, time.perf_counter() - start
+            except Exception as e:
+                return [], e, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=min(len(subreddits), FAN_OUT_MAX_WORKERS)) as executor:
+            results = dict(zip(subreddits, executor.map(fetch_listing, subreddits)))
+
+        ranked = []
+        for subreddit_name, (submissions, error, latency) in results.items():
+            self.last_fetch_report[subreddit_name] = {
+                'latency': latency,
+                'posts': len(submissions),
+                'error': str(error) if error else None
             }
+            if error:
+                logger.error(f"Failed to fetch r/{subreddit_name} after {latency:.2f}s: {error}")
+                continue
+            logger.info(f"Fetched {len(submissions)} posts from r/{subreddit_name} in {latency:.2f}s")
+
+            top_score = max((post.score for post in submissions), default=0) or 1
+            ranked.extend((post.score / top_score, post.score, post) for post in submissions)
+
+        ranked.sort(key=lambda item: item[:2], reverse=True)
+        submissions = [post for _, _, post in ranked]
+        if total_limit is not None:
+            submissions = submissions[:total_limit]
+
+        return self._process_posts(
+            submissions, include_comments, comments_limit, max_workers, seen_index, as_records,
+            source=f"{len(subreddits)} subreddits"
+        )
+
+    def hydrate(self, posts, max_workers=8):
+        """
+        Load the comments of PostRecords in parallel instead of one post at a time on first access.
+
+        Records whose comments are already loaded, and plain post dictionaries, are left as they are.
+        The time spent on each post is stored in ``last_fetch_times``.
+
+        :param posts: Posts returned with ``as_records``
+        :param max_workers: Maximum number of comment trees fetched at the same time
+        :return: The same posts, so the call can be chained
+        """
+        self.last_fetch_times = {}
+        pending = [post for post in posts if isinstance(post, PostRecord) and not post.comments_loaded]
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+                # Reading ``comments`` runs each record's loader, which uses the worker thread's own PRAW instance
+                list(executor.map(lambda record: record.comments, pending))
+        return posts
+
+    @staticmethod
+    def _validate_time_filter(time_filter):
+        valid_time_filters = ['day', 'week', 'month', 'year', 'all']
+        if time_filter not in valid_time_filters:
+            raise ValueError(f"Invalid time_filter value. Allowed values: {valid_time_filters}")
+
+    def _fetch_listing(self, subreddit_name, limit, time_filter):
+        """Request the top listing of a subreddit and return its submissions (errors are raised)."""
+        subreddit = self._worker_reddit().subreddit(subreddit_name)
+        return list(subreddit.top(time_filter=time_filter, limit=limit))
+
+    def _process_posts(self, submissions, include_comments, comments_limit, max_workers, seen_index, as_records, source):
+        """Turn listed submissions into post dictionaries or records, applying the seen index and comment options."""
+        posts_data = [self._build_post_data(post) for post in submissions]
+        posts_data, submissions = self._filter_seen(posts_data, submissions, seen_index, source)
+
+        if as_records:
+            return [
+                PostRecord.from_dict(
+                    post_data,
+                    comment_loader=partial(self._load_comment_records, post_data['id'], comments_limit)
+                    if include_comments else None
+                )
+                for post_data in posts_data
+            ]
+
+        # Fetch top comments if include_comments is True
+        if include_comments:
+            if max_workers and max_workers > 1:
+                self._hydrate_comments_concurrently(posts_data, comments_limit, max_workers)
+            else:
+                for post_data, post in zip(posts_data, submissions):
+                    post_data['comments'] = self._fetch_comments_timed(post_data['id'], post, comments_limit)
 
-            # Fetch top comments if include_comments is True
-            if include_comments:
-                post.comments.replace_more(limit=0)  # Load all comments
-                comments = post.comments.list()[:comments_limit]
-                post_data['comments'] = []
-
-                for comment in comments:
-                    if comment.author and comment.author.name != 'AutoModerator':  # Skip AutoModerator comments
-                        post_data['comments'].append({
-                            'author': comment.author.name,
-                            'body': comment.body,
-                            'score': comment.score,
-                            'created': self.convert_timestamp(comment.created_utc),
-                            'gilded': comment.gilded,
-                            'is_submitter': comment.is_submitter,
-                            'parent_id': comment.parent_id,
-                            'link_id': comment.link_id,
-                            'comment_id': comment.id
-                        })
-
-            posts_data.append(post_data)
-        
         return posts_data
 
-    def screenshot_post_preview(self, subreddit_name, post_id, output_dir=r'Backend\data\reddit_screenshots', chrome_profile_path=None):
+    def _filter_seen(self, posts_data, submissions, seen_index, source):
+        """
+        Drop posts that earlier runs already handled, before spending requests on their comments.
+
+        Nothing is recorded here: the workflow marks posts as seen once it has handled them, so a
+        post that is fetched but never processed (e.g. the run crashes) comes back next run.
+        """
+        if seen_index is None:
+            return posts_data, submissions
+
+        kept = [
+            (post_data, post) for post_data, post in zip(posts_data, submissions)
+            if seen_index.is_new_or_changed(post_data)
+        ]
+        logger.info(f"{len(kept)} of {len(posts_data)} posts from {source} are new or changed")
+        posts_data = [post_data for post_data, _ in kept]
+        submissions = [post for _, post in kept]
+        return posts_data, submissions
+
+    def _build_post_data(self, post):
+        """Build the post dictionary returned by the fetch methods from a PRAW submission."""
+        return {
+            'title': post.title,
+            'author': post.author.name if post.author else '[deleted]',
+            'score': post.score,
+            'id': post.id,
+            'url': post.url,
+            'num_comments': post.num_comments,
+            'created': self.convert_timestamp(post.created_utc),
+            'body': post.selftext if post.selftext else 'N/A',
+            'is_stickied': post.stickied,
+            'gilded': post.gilded,
+            'over_18': post.over_18,
+            'subreddit': post.subreddit.display_name,
+            'upvote_ratio': post.upvote_ratio,
+            'flair': post.link_flair_text if post.link_flair_text else 'N/A',
+            'media': post.media['o'] if post.media and 'o' in post.media else None,
+            'edited': post.edited or None
+        }
+
+    def _fetch_comments(self, post, comments_limit):
+        """
+        Load the comment tree of a submission and flatten it into comment dictionaries.
+
+        :param post: PRAW submission whose comments should be loaded
+        :param comments_limit: Number of top comments to keep
+        :return: List of comment dictionaries (AutoModerator comments are skipped)
+        """
+        post.comments.replace_more(limit=0)  # Load all comments
+        comments = post.comments.list()[:comments_limit]
+
+        comments_data = []
+        for comment in comments:
+            if comment.author and comment.author.name != 'AutoModerator':  # Skip AutoModerator comments
+                comments_data.append({
+                    'author': comment.author.name,
+                    'body': comment.body,
+                    'score': comment.score,
+                    'created': self.convert_timestamp(comment.created_utc),
+                    'gilded': comment.gilded,
+                    'is_submitter': comment.is_submitter,
+                    'parent_id': comment.parent_id,
+                    'link_id': comment.link_id,
+                    'comment_id': comment.id
+                })
+        return comments_data
+
+    def _load_comment_records(self, post_id, comments_limit):
+        """Fetch the comments of a post as CommentRecords; used as the lazy loader of PostRecords."""
+        reddit = self._worker_reddit()
+        self._wait_for_rate_limit(reddit)
+        start = time.perf_counter()
+        comments = self._fetch_comments(reddit.submission(id=post_id), comments_limit)
+        self.last_fetch_times[post_id] = time.perf_counter() - start
+        return [CommentRecord.from_dict(comment) for comment in comments]
+
+    def _fetch_comments_timed(self, post_id, submission, comments_limit):
+        """
+        Fetch the comments of one post, recording the time spent in ``last_fetch_times``.
+
+        A post whose comments fail to load gets no comments instead of failing the whole fetch;
+        the serial and the concurrent paths both go through here.
+
+        :param submission: PRAW submission of the post, or None to look it up by id with the
+                           calling thread's own PRAW instance
+        """
+        reddit = self._worker_reddit()
+        self._wait_for_rate_limit(reddit)
+        start = time.perf_counter()
+        try:
+            comments = self._fetch_comments(submission or reddit.submission(id=post_id), comments_limit)
+        except Exception as e:
+            logger.warning(f"Error fetching comments for post {post_id}: {e}")
+            comments = []
+        self.last_fetch_times[post_id] = time.perf_counter() - start
+        return comments
+
+    def _wait_for_rate_limit(self, reddit=None, min_remaining=RATE_LIMIT_MIN_REMAINING):
+        """
+        Block until Reddit's rate-limit window has room for another request.
+
+        PRAW keeps the values of the ``X-Ratelimit-*`` response headers in ``reddit.auth.limits``.
+        When fewer than ``min_remaining`` requests are left in the current window, the calling
+        worker sleeps until the window resets instead of letting the API reject the request.
+        The limits are read under a lock, but the sleep happens outside it, so workers that still
+        have room aren't held up by one that waits.
+
+        :param reddit: PRAW instance whose last response headers are checked (default ``self.reddit``)
+        """
+        with self._rate_limit_lock:
+            limits = (reddit or self.reddit).auth.limits
+            remaining = limits.get('remaining')
+            reset_timestamp = limits.get('reset_timestamp')
+            if remaining is None or reset_timestamp is None or remaining >= min_remaining:
+                return
+            wait = max(0.0, reset_timestamp - time.time())
+        if wait:
+            logger.info(f"Rate limit nearly exhausted ({remaining} left), waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    def _hydrate_comments_concurrently(self, posts_data, comments_limit, max_workers):
+        """
+        Fetch the comment trees of many posts in parallel with a bounded worker pool.
+
+        Each post's ``comments`` key is filled in place, so the result has the same shape as
+        the serial path. The time spent on each post is stored in ``last_fetch_times``.
+
+        :param posts_data: Post dictionaries built by ``_build_post_data``
+        :param comments_limit: Number of top comments to keep per post
+        :param max_workers: Maximum number of comment trees fetched at the same time
+        """
+        for _ in self._iter_hydrated(posts_data, comments_limit, max_workers):
+            pass
+
+    def _iter_hydrated(self, posts_data, comments_limit, max_workers):
+        """
+        Fetch comment trees in parallel and yield each post dictionary as soon as its comments are in.
+
+        Posts are yielded in completion order. If the consumer stops early, comment fetches that
+        have not started yet are cancelled. Each worker looks the posts up by id with its own PRAW
+        instance, because PRAW objects must not be shared between threads.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(self._fetch_comments_timed, post_data['id'], None, comments_limit): post_data
+                for post_data in posts_data
+            }
+            for future in as_completed(futures):
+                post_data = futures[future]
+                post_data['comments'] = future.result()
+                logger.debug(f"Fetched comments for post {post_data['id']} in {self.last_fetch_times[post_data['id']]:.2f}s")
+                yield post_data
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def screenshot_post_preview(self, subreddit_name, post_id, output_dir=r'Backend\data\reddit_screenshots', chrome_profile_path=None, driver_pool=None, wait_timeout=SCREENSHOT_WAIT_TIMEOUT, cache=None, post=None):
         """
         Takes a screenshot of a specific Reddit post element from the post's page.
 
@@ -104,57 +414,124 @@ class RedditClient:
         :param post_id: ID of the post (e.g., '1g78sgf')
         :param output_dir: Directory to save the screenshots (default is 'screenshots')
         :param chrome_profile_path: Path to the Chrome user profile to maintain the login session
+        :param driver_pool: Optional ChromeDriverPool to borrow a running browser from instead of starting one
+        :param wait_timeout: Seconds to wait for the post element to become visible
+        :param cache: Optional ScreenshotCache; a cached screenshot is returned instead of opening the page
+        :param post: Post dictionary (or PostRecord) of the post, required for the cache key when ``cache`` is given
         :return: Path to the saved screenshot of the post element
         """
         # Ensure the output directory exists
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Initialize undetected ChromeDriver
-        options = uc.ChromeOptions()
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-
-        # Use a user profile if provided
-        if chrome_profile_path:
-            options.add_argument(f"user-data-dir={chrome_profile_path}")  # Path to Chrome user profile
-
-        # Initialize undetected ChromeDriver with options
-        driver = uc.Chrome(options=options)
-
-        try:
-            # Navigate to the specific post page
-            reddit_post_url = f"https://www.reddit.com/r/{subreddit_name}/comments/{post_id}/"
-            driver.get(reddit_post_url)
-            time.sleep(3)  # Give the page some time to load
+        if cache is not None and post is not None:
+            screenshot_path = os.path.join(output_dir, f"post_{post_id}.png")
+            if cache.get(post, screenshot_path):
+                logger.info(f"Screenshot for post {post_id} served from cache")
+                return screenshot_path
 
-            # Select the post element using the post_id
-            post_element_selector = f"#t3_{post_id}"
-            post_element = driver.find_element(By.CSS_SELECTOR, post_element_selector)
+            return self._screenshot_and_cache(post, output_dir, driver_pool, wait_timeout, cache, chrome_profile_path)
 
-            # Take the screenshot of the post element
-            screenshot_path = os.path.join(output_dir, f"post_{post_id}.png")
-            post_element.screenshot(screenshot_path)
+        if driver_pool is not None:
+            try:
+                with driver_pool.driver() as driver:
+                    try:
+                        return self._capture_post_element(driver, subreddit_name, post_id, output_dir, wait_timeout)
+                    except TimeoutException:
+                        # The page loaded but the post never showed up; the driver itself is fine to reuse
+                        print(f"Timed out waiting for post {post_id} to appear")
+                        return None
+            except Exception as e:
+                print(f"Error taking screenshot for post {post_id}: {e}")
+                return None
 
-            # Verify if screenshot file was actually saved
-            if os.path.exists(screenshot_path):
-                print(f"Screenshot saved to: {screenshot_path}")
-            else:
-                print(f"Screenshot was not saved to {screenshot_path}. Check file permissions and path.")
-                screenshot_path = None
+        # Initialize undetected ChromeDriver
+        driver = create_chrome_driver(chrome_profile_path)
 
+        try:
+            screenshot_path = self._capture_post_element(driver, subreddit_name, post_id, output_dir, wait_timeout)
         except Exception as e:
             print(f"Error taking screenshot for post {post_id}: {e}")
             screenshot_path = None
         finally:
-            try:
-                driver.quit()  # Close the ChromeDriver session
-            except OSError as os_error:
-                print(f"OSError while quitting driver: {os_error}")
-            except Exception as e:
-                print(f"Exception while quitting driver: {e}")
+            quit_driver(driver)  # Close the ChromeDriver session
+
+        return screenshot_path
+
+    def screenshot_posts(self, posts, output_dirs, pool_size=3, chrome_profile_path=None, wait_timeout=SCREENSHOT_WAIT_TIMEOUT, cache=None):
+        """
+        Take screenshots of many posts concurrently over a pool of reused browsers.
+
+        :param posts: Post dictionaries (or PostRecords) with 'id' and 'subreddit'
+        :param output_dirs: Dictionary mapping post id to the directory its screenshot is saved in
+        :param pool_size: Number of browsers capturing at the same time
+        :param chrome_profile_path: Path to the Chrome user profile to maintain the login session
+        :param wait_timeout: Seconds to wait for each post element to become visible
+        :param cache: Optional ScreenshotCache; posts with a cached screenshot don't use a browser
+        :return: Dictionary mapping post id to the screenshot path (None if the capture failed)
+        """
+        if not posts:
+            return {}
+
+        screenshot_paths = {}
+        if cache is not None:
+            # Serve hits up front so the pool is only sized for the posts that really need a browser
+            misses = []
+            for post in posts:
+                screenshot_path = os.path.join(output_dirs[post['id']], f"post_{post['id']}.png")
+                os.makedirs(output_dirs[post['id']], exist_ok=True)
+                if cache.get(post, screenshot_path):
+                    screenshot_paths[post['id']] = screenshot_path
+                else:
+                    misses.append(post)
+            posts = misses
+            if not posts:
+                return screenshot_paths
+
+        pool_size = max(1, min(pool_size, len(posts)))
+        with ChromeDriverPool(size=pool_size, chrome_profile_path=chrome_profile_path) as driver_pool:
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = {
+                    post['id']: executor.submit(
+                        self._screenshot_and_cache, post, output_dirs[post['id']], driver_pool, wait_timeout, cache
+                    )
+                    for post in posts
+                }
+                screenshot_paths.update((post_id, future.result()) for post_id, future in futures.items())
 
+        return screenshot_paths
+
+    def _screenshot_and_cache(self, post, output_dir, driver_pool, wait_timeout, cache, chrome_profile_path=None):
+        """Capture a post (without a cache lookup) and store the result in the cache, if one is given."""
+        start = time.perf_counter()
+        screenshot_path = self.screenshot_post_preview(
+            post['subreddit'], post['id'], output_dir=output_dir, chrome_profile_path=chrome_profile_path,
+            driver_pool=driver_pool, wait_timeout=wait_timeout
+        )
+        if screenshot_path and cache is not None:
+            cache.put(post, screenshot_path, time.perf_counter() - start)
         return screenshot_path
 
+    def _capture_post_element(self, driver, subreddit_name, post_id, output_dir, wait_timeout):
+        """Open a post's page in the given driver and screenshot its post element once it is visible."""
+        # Navigate to the specific post page
+        reddit_post_url = f"https://www.reddit.com/r/{subreddit_name}/comments/{post_id}/"
+        driver.get(reddit_post_url)
+
+        # Wait for the post element instead of sleeping a fixed time
+        post_element_selector = f"#t3_{post_id}"
+        post_element = WebDriverWait(driver, wait_timeout).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, post_element_selector))
+        )
+
+        # Take the screenshot of the post element
+        screenshot_path = os.path.join(output_dir, f"post_{post_id}.png")
+        post_element.screenshot(screenshot_path)
 
+        # Verify if screenshot file was actually saved
+        if os.path.exists(screenshot_path):
+            print(f"Screenshot saved to: {screenshot_path}")
+            return screenshot_path
 
+        print(f"Screenshot was not saved to {screenshot_path}. Check file permissions and path.")
+        return None
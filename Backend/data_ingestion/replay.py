@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import random
+import inspect
+import threading
+import logging
+from .records import PostRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECORDING_PATH = os.path.join('Backend', 'data', 'reddit_recording.jsonl')
+
+
+def _post_to_dict(post, include_comments):
+    if hasattr(post, 'to_dict'):
+        return post.to_dict(include_comments=True if include_comments else None)
+    return post
+
+
+class RecordingRedditClient:
+    """
+    Wraps a RedditClient and appends every post it returns to a JSONL recording.
+
+    Each line holds one post (with its comments when they were requested) plus the time it
+    took to fetch, so ``ReplayRedditClient`` can serve the same run later without network
+    access. Methods that are not recorded (e.g. ``screenshot_post_preview``) are passed
+    through to the wrapped client.
+    """
+
+    def __init__(self, client, path=DEFAULT_RECORDING_PATH):
+        """
+        :param client: The RedditClient to record
+        :param path: Path of the JSONL recording (appended to if it exists)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.client = client
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def fetch_top_posts(self, subreddit_name, *args, **kwargs):
+        include_comments = self._include_comments(self.client.fetch_top_posts, subreddit_name, *args, **kwargs)
+        start = time.perf_counter()
+        posts = self.client.fetch_top_posts(subreddit_name, *args, **kwargs)
+        self._record(posts, time.perf_counter() - start, include_comments)
+        return posts
+
+    def fetch_many(self, subreddits, *args, **kwargs):
+        include_comments = self._include_comments(self.client.fetch_many, subreddits, *args, **kwargs)
+        start = time.perf_counter()
+        posts = self.client.fetch_many(subreddits, *args, **kwargs)
+        self._record(posts, time.perf_counter() - start, include_comments)
+        return posts
+
+    def iter_top_posts(self, subreddit_name, *args, **kwargs):
+        include_comments = self._include_comments(self.client.iter_top_posts, subreddit_name, *args, **kwargs)
+        start = time.perf_counter()
+        for post in self.client.iter_top_posts(subreddit_name, *args, **kwargs):
+            now = time.perf_counter()
+            self._record([post], now - start, include_comments, batch=False)
+            start = now
+            yield post
+
+    @staticmethod
+    def _include_comments(method, *args, **kwargs):
+        """Whether a call of a fetch method asks for comments, whether it is passed by position or by name."""
+        arguments = inspect.signature(method).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        return arguments.arguments.get('include_comments')
+
+    def _record(self, posts, elapsed, include_comments, batch=True):
+        """
+        Append posts to the recording.
+
+        :param elapsed: Seconds it took to fetch the posts; spread evenly over them when ``batch`` is True
+        """
+        if not posts:
+            return
+        fetch_time = elapsed / len(posts) if batch else elapsed
+        with self._lock, open(self.path, 'a', encoding='utf-8') as recording:
+            for post in posts:
+                line = {'fetch_time': round(fetch_time, 4), 'post': _post_to_dict(post, include_comments)}
+                recording.write(json.dumps(line, separators=(',', ':')) + '\n')
+        logger.info(f"Recorded {len(posts)} posts to {self.path}")
+
+
+class ReplayRedditClient:
+    """
+    Serves posts from a recording made by ``RecordingRedditClient`` instead of live Reddit.
+
+    It offers the same fetch methods as ``RedditClient``, so the workflows and benchmarks can run
+    offline. Posts are served at full speed by default, or with simulated fetch latency.
+    """
+
+    def __init__(self, path=DEFAULT_RECORDING_PATH, latency=None, jitter=0.0):
+        """
+        :param path: Path of the JSONL recording
+        :param latency: None for full speed, 'recorded' to replay the recorded fetch time of each
+                        post, or a number of seconds to wait per post
+        :param jitter: Random fraction (e.g. 0.2 for +/-20%) applied to each simulated wait
+        """
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.last_fetch_times = {}
+        self.last_fetch_report = {}
+        self._entries = {}  # Latest recorded entry per post id, in recording order
+
+        with open(path, 'r', encoding='utf-8') as recording:
+            for line in recording:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.pop(entry['post']['id'], None)
+                    self._entries[entry['post']['id']] = entry
+        logger.info(f"Loaded {len(self._entries)} recorded posts from {path}")
+
+    def fetch_top_posts(self, subreddit_name, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=None, seen_index=None, as_records=False):
+        """Return recorded posts of a subreddit; see ``RedditClient.fetch_top_posts``."""
+        return list(self.iter_top_posts(
+            subreddit_name, limit, time_filter, include_comments, comments_limit, max_workers, seen_index, as_records
+        ))
+
+    def iter_top_posts(self, subreddit_name, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=None, seen_index=None, as_records=False):
+        """Yield recorded posts of a subreddit, one at a time; see ``RedditClient.iter_top_posts``."""
+        entries = [
+            entry for entry in self._entries.values()
+            if entry['post'].get('subreddit', '').lower() == subreddit_name.lower()
+        ]
+        entries.sort(key=lambda entry: entry['post']['score'], reverse=True)
+        yield from self._serve(entries[:limit], include_comments, comments_limit, seen_index, as_records)
+
+    def fetch_many(self, subreddits, limit=5, time_filter='day', include_comments=False, comments_limit=100, max_workers=None, seen_index=None, as_records=False, total_limit=None):
+        """Return recorded posts of many subreddits ranked as ``RedditClient.fetch_many`` does."""
+        self.last_fetch_report = {}
+        ranked = []
+        for subreddit_name in dict.fromkeys(subreddits):
+            start = time.perf_counter()
+            entries = [
+                entry for entry in self._entries.values()
+                if entry['post'].get('subreddit', '').lower() == subreddit_name.lower()
+            ]
+            entries = sorted(entries, key=lambda entry: entry['post']['score'], reverse=True)[:limit]
+            self.last_fetch_report[subreddit_name] = {
+                'latency': time.perf_counter() - start,
+                'posts': len(entries),
+                'error': None if entries else 'No recorded posts'
+            }
+            top_score = max((entry['post']['score'] for entry in entries), default=0) or 1
+            ranked.extend((entry['post']['score'] / top_score, entry['post']['score'], entry) for entry in entries)
+
+        ranked.sort(key=lambda item: item[:2], reverse=True)
+        entries = [entry for _, _, entry in ranked]
+        if total_limit is not None:
+            entries = entries[:total_limit]
+        return list(self._serve(entries, include_comments, comments_limit, seen_index, as_records))
+
+    def hydrate(self, posts, max_workers=None):
+        """Recorded posts are served with their comments already in; see ``RedditClient.hydrate``."""
+        return posts
+
+    def screenshot_post_preview(self, subreddit_name, post_id, output_dir=None, **kwargs):
+        """Screenshots need a live page; replays only return an image that already exists on disk."""
+        screenshot_path = os.path.join(output_dir or '.', f"post_{post_id}.png")
+        return screenshot_path if os.path.exists(screenshot_path) else None
+
+    def _serve(self, entries, include_comments, comments_limit, seen_index, as_records):
+        posts = [dict(entry['post']) for entry in entries]
+        if seen_index is not None:
+            posts = seen_index.filter_new_or_changed(posts)
+        fetch_times = {entry['post']['id']: entry.get('fetch_time', 0.0) for entry in entries}
+
+        for post in posts:
+            self._simulate_latency(fetch_times.get(post['id'], 0.0))
+            if include_comments:
+                post['comments'] = post.get('comments', [])[:comments_limit]
+            else:
+                post.pop('comments', None)
+            self.last_fetch_times[post['id']] = fetch_times.get(post['id'], 0.0)
+            yield PostRecord.from_dict(post) if as_records else post
+
+    def _simulate_latency(self, recorded_time):
+        if self.latency is None:
+            return
+        wait = recorded_time if self.latency == 'recorded' else float(self.latency)
+        if self.jitter:
+            wait *= 1 + random.uniform(-self.jitter, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
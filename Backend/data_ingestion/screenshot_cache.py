@@ -0,0 +1,126 @@
+import os
+import math
+import shutil
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('Backend', 'data', 'screenshot_cache')
+
+
+class ScreenshotCache:
+    """
+    Disk cache of post screenshots keyed by post id and a hash of what the screenshot shows.
+
+    The key covers the title, the body and a logarithmic score bucket, so a screenshot is reused
+    until the post is edited or its score moves noticeably. The total size of the cache is
+    bounded; the least recently used screenshots are evicted first.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=500 * 1024 * 1024, score_bucket_base=1.25):
+        """
+        :param cache_dir: Directory the cached screenshots are stored in
+        :param max_bytes: Maximum total size of the cached screenshots
+        :param score_bucket_base: Growth factor between score buckets (1.25 means ~25% wide buckets)
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.score_bucket_base = score_bucket_base
+        self.hits = 0
+        self.misses = 0
+        self.capture_seconds = 0.0  # Browser time spent on misses, used to estimate the time saved by hits
+        self._lock = threading.Lock()
+        self._total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith('.png')
+        )
+
+    def score_bucket(self, score):
+        """Map a score to a coarse bucket so small score changes still hit the cache."""
+        return int(math.log(max(score, 0) + 1, self.score_bucket_base))
+
+    def key(self, post):
+        """Cache key of a post: its id plus a hash of title, body and score bucket."""
+        content = '\x00'.join([post['title'], post.get('body') or '', str(self.score_bucket(post['score']))])
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        return f"{post['id']}_{digest}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, post, destination_path):
+        """
+        Copy the cached screenshot of a post to ``destination_path`` if there is one.
+
+        :return: ``destination_path`` on a hit, None on a miss
+        """
+        cached_path = self._path(self.key(post))
+        with self._lock:
+            if not os.path.exists(cached_path):
+                self.misses += 1
+                return None
+            self.hits += 1
+            os.utime(cached_path)  # Mark as recently used
+
+        if os.path.abspath(cached_path) != os.path.abspath(destination_path):
+            shutil.copyfile(cached_path, destination_path)
+        return destination_path
+
+    def put(self, post, screenshot_path, capture_seconds=0.0):
+        """
+        Store a freshly captured screenshot and evict old entries if the cache is over its size limit.
+
+        :param capture_seconds: Time the capture took, used for the ``saved_seconds`` estimate
+        """
+        key = self.key(post)
+        cached_path = self._path(key)
+        with self._lock:
+            self.capture_seconds += capture_seconds
+            # Drop screenshots of older revisions of the same post
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.startswith(f"{post['id']}_") and entry.name != f"{key}.png":
+                    self._total_bytes -= entry.stat().st_size
+                    os.remove(entry.path)
+
+            if os.path.exists(cached_path):
+                self._total_bytes -= os.path.getsize(cached_path)
+            shutil.copyfile(screenshot_path, cached_path)
+            self._total_bytes += os.path.getsize(cached_path)
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.png')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._total_bytes -= entry.stat().st_size
+            os.remove(entry.path)
+            logger.debug(f"Evicted cached screenshot {entry.name}")
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def saved_seconds(self):
+        """Estimated browser time saved, assuming a hit would have cost an average capture."""
+        return self.hits * self.capture_seconds / self.misses if self.misses else 0.0
+
+    def stats(self):
+        """Hit/miss counters, hit rate, estimated time saved and current size of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'saved_seconds': self.saved_seconds,
+            'bytes': self._total_bytes
+        }
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join('Backend', 'data', 'seen_posts.sqlite3')
+
+
+class SeenPostIndex:
+    """
+    Persistent index of the Reddit posts that earlier runs already fetched and rendered.
+
+    Posts are keyed by id and remember the score and edit time they had when they were last
+    seen, so a later run can tell new or materially changed posts apart from ones it has
+    already handled.
+    """
+
+    def __init__(self, db_path=DEFAULT_INDEX_PATH, score_change_ratio=0.5, min_score_change=50):
+        """
+        :param db_path: Path of the SQLite database file (created if missing)
+        :param score_change_ratio: Relative score change that makes a seen post count as changed
+        :param min_score_change: Absolute score change required as well, so small posts don't flap
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self.score_change_ratio = score_change_ratio
+        self.min_score_change = min_score_change
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                id TEXT PRIMARY KEY,
+                subreddit TEXT,
+                score INTEGER,
+                edited REAL,
+                first_seen REAL,
+                last_seen REAL,
+                rendered_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def is_new_or_changed(self, post):
+        """
+        Check whether a post was never seen or changed materially since it was last seen.
+
+        :param post: Post dictionary as returned by ``RedditClient.fetch_top_posts``
+        :return: True if the post should be processed again
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT score, edited FROM posts WHERE id = ?", (post['id'],)
+            ).fetchone()
+        if row is None:
+            return True
+
+        seen_score, seen_edited = row
+        if (post.get('edited') or None) != seen_edited:
+            return True
+
+        score_change = abs(post['score'] - (seen_score or 0))
+        return (
+            score_change >= self.min_score_change
+            and score_change >= abs(seen_score or 0) * self.score_change_ratio
+        )
+
+    def filter_new_or_changed(self, posts):
+        """Return only the posts that are new or changed since the last run."""
+        return [post for post in posts if self.is_new_or_changed(post)]
+
+    def mark_seen(self, posts):
+        """
+        Record the current score and edit time of the given posts.
+
+        Call this once the workflow has handled the posts (passed over by the selection, rendered,
+        or rendered by an earlier run), so posts that failed or were never processed stay eligible.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO posts (id, subreddit, score, edited, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    score = excluded.score,
+                    edited = excluded.edited,
+                    last_seen = excluded.last_seen
+                """,
+                [
+                    (post['id'], post.get('subreddit'), post['score'], post.get('edited') or None, now, now)
+                    for post in posts
+                ]
+            )
+            self._conn.commit()
+
+    def mark_rendered(self, post_id):
+        """Record that a video was rendered for the given post."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO posts (id, first_seen, last_seen, rendered_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET rendered_at = excluded.rendered_at
+                """,
+                (post_id, now, now, now)
+            )
+            self._conn.commit()
+
+    def is_rendered(self, post_id):
+        """Check whether a video was already rendered for the given post."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rendered_at FROM posts WHERE id = ?", (post_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def filter_unrendered(self, posts):
+        """Return only the posts that no earlier run rendered a video for."""
+        unrendered = [post for post in posts if not self.is_rendered(post['id'])]
+        skipped = len(posts) - len(unrendered)
+        if skipped:
+            logger.info(f"Skipping {skipped} posts that were already rendered")
+        return unrendered
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
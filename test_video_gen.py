@@ -4,6 +4,8 @@ import os
 import logging
 import traceback
 import random
+from Backend.TTS.manifest import load_manifest
+from Backend.Video_agent.ffmpeg_render import probe_duration, render_with_ffmpeg
 
 # Configure logging
 def configure_logging(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"):
@@ -19,9 +21,10 @@ default_config = {
     "audio_bitrate": "192k",
     "preset": "slow",
     "crf": "18",
-    "threads": 8,
+    "threads": None,  # None uses one encoder thread per core of the machine
     "bg_videos_folder": os.path.join("Backend", "Workflows", "Assets", "bg_videos"),
-    "ffmpeg_params": ["-crf", "18"]
+    "ffmpeg_params": ["-crf", "18"],
+    "engine": "moviepy"  # "ffmpeg" renders the same layout with a single ffmpeg filter graph
 }
 
 def create_tiktok_video(
@@ -37,7 +40,8 @@ def create_tiktok_video(
     preset: str = None,
     desired_width: int = None,
     desired_height: int = None,
-    ffmpeg_params: list = None
+    ffmpeg_params: list = None,
+    engine: str = None
 ):
     try:
         logger = configure_logging()
@@ -50,9 +54,10 @@ def create_tiktok_video(
         audio_bitrate = audio_bitrate or config['audio_bitrate']
         preset = preset or config['preset']
         crf = crf or config['crf']
-        threads = threads or config['threads']
+        threads = threads or config['threads'] or os.cpu_count()
         ffmpeg_params = ffmpeg_params or config['ffmpeg_params']
         bg_videos_folder = bg_videos_folder or config['bg_videos_folder']
+        engine = engine or config.get('engine', 'moviepy')
 
         logger.info(f"Desired dimensions: {desired_width}x{desired_height}")
 
@@ -84,10 +89,17 @@ def create_tiktok_video(
         temp_resized_screenshot = os.path.join(post_folder, "padded_screenshot.png")
         padded_img.save(temp_resized_screenshot)
 
-        # Load narration and get duration
-        logger.info(f"Loading narration: {narration_path}")
-        narration = AudioFileClip(narration_path)
-        video_duration = narration.duration
+        if engine == "ffmpeg":
+            return render_tiktok_video_ffmpeg(
+                post_folder, output_filename, narration_path, temp_resized_screenshot, bg_videos_folder,
+                (desired_width, desired_height), fps, bitrate, audio_bitrate, preset, threads, logger
+            )
+
+        # Get the duration from the narration manifest when the TTS step wrote one; the narration
+        # is only opened up front to measure it when there is none
+        manifest = load_manifest(narration_path)
+        narration = None if manifest else AudioFileClip(narration_path)
+        video_duration = manifest['duration'] if manifest else narration.duration
         logger.info(f"Video duration: {video_duration} seconds")
 
         # Attempt to load a background video
@@ -130,6 +142,8 @@ def create_tiktok_video(
             clips.insert(0, background_video)  # Add background video as the first layer if loaded
 
         final_video = CompositeVideoClip(clips, size=(desired_width, desired_height))
+        logger.info(f"Loading narration: {narration_path}")
+        narration = narration or AudioFileClip(narration_path)
         final_video = final_video.set_audio(narration)
         logger.info(f"Final video dimensions: {final_video.size}")
 
@@ -167,6 +181,46 @@ def create_tiktok_video(
         traceback.print_exc()
         return None
 
+def render_tiktok_video_ffmpeg(
+    post_folder, output_filename, narration_path, screenshot_path, bg_videos_folder,
+    size, fps, bitrate, audio_bitrate, preset, threads, logger
+):
+    """Render the layout of create_tiktok_video with a single ffmpeg filter graph instead of moviepy."""
+    try:
+        manifest = load_manifest(narration_path)
+        video_duration = manifest['duration'] if manifest else probe_duration(narration_path)
+        logger.info(f"Video duration: {video_duration} seconds")
+
+        background_path = None
+        if os.path.isdir(bg_videos_folder):
+            bg_video_files = [f for f in os.listdir(bg_videos_folder) if f.endswith(('.mp4', '.webm'))]
+            if bg_video_files:
+                background_path = os.path.join(bg_videos_folder, random.choice(bg_video_files))
+                logger.info(f"Using background video: {background_path}")
+
+        # Same framing as the moviepy path: the background is scaled to the frame height and
+        # anchored at the left edge, and the padded screenshot sits at the top-left corner
+        output_path = os.path.join(post_folder, output_filename)
+        logger.info(f"Saving video to: {output_path}")
+        render_with_ffmpeg(
+            output_path,
+            size,
+            duration=video_duration,
+            background_path=background_path,
+            background_anchor='left',
+            overlays=[{'path': screenshot_path, 'x': 0, 'y': 0}],
+            audio_path=narration_path,
+            encoder_options={
+                "fps": fps, "bitrate": bitrate, "audio_bitrate": audio_bitrate, "preset": preset, "threads": threads
+            }
+        )
+
+        logger.info("TikTok video created successfully!")
+        return output_path
+    finally:
+        if os.path.exists(screenshot_path):
+            os.remove(screenshot_path)
+
 # Example usage
 if __name__ == "__main__":
     test_post_folder = os.path.join(